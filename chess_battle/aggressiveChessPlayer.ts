@@ -105,15 +105,228 @@ const DOUBLED_PAWN_PENALTY = -20;
 /** Bonus for passed pawns */
 const PASSED_PAWN_BONUS = 50;
 
-/** Aggression multiplier for captures */
-const CAPTURE_AGGRESSION_BONUS = 1.2;
+/** Aggression multiplier for captures, in percent (integer so scores stay small ints) */
+const CAPTURE_AGGRESSION_PERCENT = 120;
+
+/** Root move bonus for capturing each piece type (piece value scaled by the aggression multiplier) */
+const CAPTURE_BONUS_VALUES: Record<PieceType, number> = {
+	pawn: Math.round(PIECE_VALUES.pawn * CAPTURE_AGGRESSION_PERCENT / 100),
+	knight: Math.round(PIECE_VALUES.knight * CAPTURE_AGGRESSION_PERCENT / 100),
+	bishop: Math.round(PIECE_VALUES.bishop * CAPTURE_AGGRESSION_PERCENT / 100),
+	rook: Math.round(PIECE_VALUES.rook * CAPTURE_AGGRESSION_PERCENT / 100),
+	queen: Math.round(PIECE_VALUES.queen * CAPTURE_AGGRESSION_PERCENT / 100),
+	king: Math.round(PIECE_VALUES.king * CAPTURE_AGGRESSION_PERCENT / 100),
+};
+
+/** Evaluation bonus for attacking each piece type (a tenth of the capture bonus) */
+const ATTACK_BONUS_VALUES: Record<PieceType, number> = {
+	pawn: Math.round(CAPTURE_BONUS_VALUES.pawn / 10),
+	knight: Math.round(CAPTURE_BONUS_VALUES.knight / 10),
+	bishop: Math.round(CAPTURE_BONUS_VALUES.bishop / 10),
+	rook: Math.round(CAPTURE_BONUS_VALUES.rook / 10),
+	queen: Math.round(CAPTURE_BONUS_VALUES.queen / 10),
+	king: Math.round(CAPTURE_BONUS_VALUES.king / 10),
+};
+
+/** Evaluation bonus per available move of the side to move */
+const MOBILITY_BONUS_PER_MOVE = 5;
 
 /** Bonus for checks */
 const CHECK_BONUS = 30;
 
-/** Search depth for minimax algorithm */
+/**
+ * Score of a checkmate on the board; larger than any static evaluation. A mate
+ * `ply` plies below the root scores MATE_SCORE - ply, so quicker mates score higher.
+ */
+const MATE_SCORE = 1_000_000;
+
+/** Scores at or above this (or at or below its negation) are a forced mate rather than an evaluation */
+const MATE_THRESHOLD = MATE_SCORE / 2;
+
+/**
+ * Search window bound. Kept as an integer (rather than Infinity) so that every
+ * score stays a V8 small integer and never becomes a heap-allocated double.
+ */
+const INFINITY_SCORE = 1_000_000_000;
+
+/** A (rank, file) step used for piece movement and attack rays */
+interface Direction {
+	readonly rank: number;
+	readonly file: number;
+}
+
+/** Knight jump offsets */
+const KNIGHT_OFFSETS: readonly Direction[] = [
+	{ rank: 2, file: 1 }, { rank: 2, file: -1 },
+	{ rank: -2, file: 1 }, { rank: -2, file: -1 },
+	{ rank: 1, file: 2 }, { rank: 1, file: -2 },
+	{ rank: -1, file: 2 }, { rank: -1, file: -2 },
+];
+
+/** Rook (and queen) sliding directions */
+const STRAIGHT_DIRECTIONS: readonly Direction[] = [
+	{ rank: 1, file: 0 }, { rank: -1, file: 0 },
+	{ rank: 0, file: 1 }, { rank: 0, file: -1 },
+];
+
+/** Bishop (and queen) sliding directions */
+const DIAGONAL_DIRECTIONS: readonly Direction[] = [
+	{ rank: 1, file: 1 }, { rank: 1, file: -1 },
+	{ rank: -1, file: 1 }, { rank: -1, file: -1 },
+];
+
+/** Queen sliding directions and king step offsets */
+const ALL_DIRECTIONS: readonly Direction[] = [...STRAIGHT_DIRECTIONS, ...DIAGONAL_DIRECTIONS];
+
+/** File offsets of pawn captures */
+const PAWN_CAPTURE_FILE_OFFSETS: readonly number[] = [-1, 1];
+
+/** Promotion choices, strongest first (aggressive player prefers queen) */
+const PROMOTION_PIECES: readonly PieceType[] = ['queen', 'rook', 'bishop', 'knight'];
+
+/** Move ordering score for captures, placing them ahead of killers and quiet moves */
+const CAPTURE_ORDER_BONUS = 100_000;
+
+/** Move ordering scores for the first and second killer moves of a ply */
+const KILLER_ORDER_BONUS = [50_000, 49_000];
+
+/** Cap on the history counter's contribution, keeping quiet moves below the killers */
+const HISTORY_ORDER_LIMIT = 40_000;
+
+/** Move ordering bonus for landing next to the enemy king, reduced per square of distance */
+const KING_PROXIMITY_ORDER_BONUS = 300;
+const KING_PROXIMITY_ORDER_STEP = 50;
+
+/** Maximum Manhattan distance from the enemy king that earns a proximity ordering bonus */
+const KING_PROXIMITY_RADIUS = 2;
+
+/** Manhattan distance between two squares, indexed by (fromSquare * 64 + toSquare) */
+const MANHATTAN_DISTANCE = (() => {
+	const table = new Uint8Array(64 * 64);
+	for (let a = 0; a < 64; a++) {
+		for (let b = 0; b < 64; b++) {
+			table[a * 64 + b] = Math.abs((a & 7) - (b & 7)) + Math.abs((a >> 3) - (b >> 3));
+		}
+	}
+	return table;
+})();
+
+/** Search depth for negamax algorithm */
 const SEARCH_DEPTH = 3;
 
+/** Depth reduction of the verification search after a null move */
+const NULL_MOVE_REDUCTION = 2;
+
+/** Shallowest remaining depth at which null-move pruning is tried */
+const NULL_MOVE_MIN_DEPTH = 3;
+
+/**
+ * Quiescence plies past the horizon in which a side in check searches all its
+ * evasions; deeper, a position in check is scored by the static evaluation, so a
+ * long run of checking captures and evasions cannot keep the search going
+ */
+const QUIESCENCE_EVASION_PLIES = 4;
+
+/**
+ * How far the terms other than the piece-square score (mobility, attacks, pawn
+ * structure, checks...) are assumed to move a position's evaluation at most, for
+ * lazy evaluation. A heuristic bound: only unusual positions exceed it.
+ */
+const LAZY_EVALUATION_MARGIN = 500;
+
+/** Number of evaluation cache slots (a power of two, indexed by the low hash bits) */
+const EVALUATION_CACHE_SIZE = 1 << 20;
+
+/** Number of pawn structure cache slots, as a power of two (indexed by a hash of the pawn bitboards) */
+const PAWN_CACHE_BITS = 14;
+const PAWN_CACHE_SIZE = 1 << PAWN_CACHE_BITS;
+
+/** Number of transposition table slots (a power of two, indexed by the low hash bits) */
+const TRANSPOSITION_TABLE_SIZE = 1 << 20;
+
+// ============================================================================
+// Bitboards
+// ============================================================================
+// A 64-bit square set is stored as two unsigned 32-bit halves (JavaScript bit
+// operators are 32-bit): `lo` holds squares 0-31 (ranks 1-4) and `hi` holds
+// squares 32-63 (ranks 5-8), where square = rank * 8 + file.
+
+/**
+ * Tests whether a square is in a bitboard
+ */
+function hasSquare(lo: number, hi: number, square: number): boolean {
+	return ((square < 32 ? lo >>> square : hi >>> (square - 32)) & 1) !== 0;
+}
+
+/**
+ * Counts the squares in a bitboard
+ */
+function countSquares(lo: number, hi: number): number {
+	return countBits(lo) + countBits(hi);
+}
+
+/**
+ * Returns the lowest set bit position of a non-zero 32-bit value
+ */
+function lowestBit(value: number): number {
+	return 31 - Math.clz32(value & -value);
+}
+
+/**
+ * Counts the set bits of a 32-bit value (SWAR population count)
+ */
+function countBits(value: number): number {
+	value -= (value >>> 1) & 0x55555555;
+	value = (value & 0x33333333) + ((value >>> 2) & 0x33333333);
+	return (Math.imul((value + (value >>> 4)) & 0x0f0f0f0f, 0x01010101) >>> 24);
+}
+
+/**
+ * Builds one bitboard per origin square from a membership predicate,
+ * returned as parallel arrays of low and high halves
+ */
+function buildSquareMasks(includes: (origin: number, square: number) => boolean): [Uint32Array, Uint32Array] {
+	const lo = new Uint32Array(64);
+	const hi = new Uint32Array(64);
+	for (let origin = 0; origin < 64; origin++) {
+		for (let square = 0; square < 64; square++) {
+			if (includes(origin, square)) {
+				if (square < 32) {
+					lo[origin] |= 1 << square;
+				} else {
+					hi[origin] |= 1 << (square - 32);
+				}
+			}
+		}
+	}
+	return [lo, hi];
+}
+
+/** The four center squares (d4, e4, d5, e5), as a bitboard */
+const [CENTER_LO, CENTER_HI] = [0x18000000, 0x00000018];
+
+/** The extended center (c3-f6), center squares included, as a bitboard */
+const [EXTENDED_CENTER_LO, EXTENDED_CENTER_HI] = [0x3c3c0000, 0x00003c3c];
+
+/** Squares on the same file as a square, the square itself included */
+const [FILE_MASK_LO, FILE_MASK_HI] = buildSquareMasks((origin, square) => (origin & 7) === (square & 7));
+
+/**
+ * Squares in front of a pawn (by square) on its own and adjacent files, per
+ * color: an enemy pawn on any of them stops the pawn from being passed
+ */
+const [WHITE_PASSED_MASK_LO, WHITE_PASSED_MASK_HI] = buildSquareMasks(
+	(pawn, square) => (square >> 3) > (pawn >> 3) && Math.abs((square & 7) - (pawn & 7)) <= 1
+);
+const [BLACK_PASSED_MASK_LO, BLACK_PASSED_MASK_HI] = buildSquareMasks(
+	(pawn, square) => (square >> 3) < (pawn >> 3) && Math.abs((square & 7) - (pawn & 7)) <= 1
+);
+
+/** Squares close enough to a king (by square) to earn the proximity ordering bonus */
+const [KING_ZONE_LO, KING_ZONE_HI] = buildSquareMasks(
+	(king, square) => MANHATTAN_DISTANCE[king * 64 + square] <= KING_PROXIMITY_RADIUS
+);
+
 // ============================================================================
 // Board Utilities
 // ============================================================================
@@ -170,6 +383,9 @@ export function getPieceAt(board: Board, pos: Position): Piece | null {
 	return board[pos.rank][pos.file];
 }
 
+/** One shared, read-only Position per square (square = rank * 8 + file) */
+const SQUARE_POSITIONS: readonly Position[] = Array.from({ length: 64 }, (_, square) => ({ rank: square >> 3, file: square & 7 }));
+
 /**
  * Checks if a position is within the board bounds
  */
@@ -212,112 +428,142 @@ export function getOpponentColor(color: Color): Color {
  * (Does not check if the move leaves own king in check)
  */
 export function generatePieceMoves(state: GameState, pos: Position): Move[] {
+	const moves: Move[] = [];
 	const piece = getPieceAt(state.board, pos);
-	if (!piece || piece.color !== state.currentPlayer) {
-		return [];
+	if (piece && piece.color === state.currentPlayer) {
+		addPieceMoves(state, pos, piece, moves);
 	}
+	return moves;
+}
 
+/**
+ * Appends the pseudo-legal moves of a piece to `moves`. The generators below all
+ * append to one caller-supplied list, so generating a position's moves builds a
+ * single array instead of one per piece.
+ */
+function addPieceMoves(state: GameState, pos: Position, piece: Piece, moves: Move[]): void {
 	switch (piece.type) {
 		case 'pawn':
-			return generatePawnMoves(state, pos, piece.color);
+			generatePawnMoves(state, pos, piece.color, moves);
+			break;
 		case 'knight':
-			return generateKnightMoves(state, pos, piece.color);
+			generateKnightMoves(state, pos, piece.color, moves);
+			break;
 		case 'bishop':
-			return generateBishopMoves(state, pos, piece.color);
+			generateBishopMoves(state, pos, piece.color, moves);
+			break;
 		case 'rook':
-			return generateRookMoves(state, pos, piece.color);
+			generateRookMoves(state, pos, piece.color, moves);
+			break;
 		case 'queen':
-			return generateQueenMoves(state, pos, piece.color);
+			generateQueenMoves(state, pos, piece.color, moves);
+			break;
 		case 'king':
-			return generateKingMoves(state, pos, piece.color);
-		default:
-			return [];
+			generateKingMoves(state, pos, piece.color, moves);
+			break;
 	}
 }
 
+/**
+ * Every distinct move, created on first use, indexed by from and to squares,
+ * promotion piece (PIECE_TYPE_INDEX, 0 for none) and one bit per flag: capture,
+ * en passant and castling. Moves are immutable, so generating a move hands out
+ * the shared object instead of allocating one at every node.
+ */
+const INTERNED_MOVES: (Move | undefined)[] = new Array(64 * 64 * 5 * 8).fill(undefined);
+
+/**
+ * Creates a move, or returns the interned move with the same fields. Every move
+ * gets all fields, in the same order, so all moves share one object shape and
+ * reading their fields in the search stays fast.
+ */
+function createMove(
+	from: Position,
+	to: Position,
+	isCapture: boolean = false,
+	promotion?: PieceType,
+	isEnPassant: boolean = false,
+	isCastle: boolean = false
+): Move {
+	const fromSquare = from.rank * 8 + from.file;
+	const toSquare = to.rank * 8 + to.file;
+	const index = ((fromSquare * 64 + toSquare) * 5 + (promotion ? PIECE_TYPE_INDEX[promotion] : 0)) * 8 +
+		(isCapture ? 1 : 0) + (isEnPassant ? 2 : 0) + (isCastle ? 4 : 0);
+	return INTERNED_MOVES[index] ??= {
+		from: SQUARE_POSITIONS[fromSquare],
+		to: SQUARE_POSITIONS[toSquare],
+		promotion,
+		isCapture,
+		isCastle,
+		isEnPassant,
+	};
+}
+
 /**
  * Generates all pawn moves from a position
  */
-function generatePawnMoves(state: GameState, pos: Position, color: Color): Move[] {
-	const moves: Move[] = [];
+function generatePawnMoves(state: GameState, pos: Position, color: Color, moves: Move[]): void {
 	const direction = color === 'white' ? 1 : -1;
 	const startRank = color === 'white' ? 1 : 6;
 	const promotionRank = color === 'white' ? 7 : 0;
+	const targetRank = pos.rank + direction;
+	if (targetRank < 0 || targetRank > 7) {
+		return;
+	}
 
 	// Single push
-	const singlePush: Position = { rank: pos.rank + direction, file: pos.file };
-	if (isValidPosition(singlePush) && !getPieceAt(state.board, singlePush)) {
-		if (singlePush.rank === promotionRank) {
+	if (!state.board[targetRank][pos.file]) {
+		const singlePush = SQUARE_POSITIONS[targetRank * 8 + pos.file];
+		if (targetRank === promotionRank) {
 			// Promotion moves - aggressive player prefers queen
-			for (const promotion of ['queen', 'rook', 'bishop', 'knight'] as PieceType[]) {
-				moves.push({ from: pos, to: singlePush, promotion });
+			for (const promotion of PROMOTION_PIECES) {
+				moves.push(createMove(pos, singlePush, false, promotion));
 			}
 		} else {
-			moves.push({ from: pos, to: singlePush });
+			moves.push(createMove(pos, singlePush));
 
 			// Double push from starting position
-			if (pos.rank === startRank) {
-				const doublePush: Position = { rank: pos.rank + 2 * direction, file: pos.file };
-				if (!getPieceAt(state.board, doublePush)) {
-					moves.push({ from: pos, to: doublePush });
-				}
+			if (pos.rank === startRank && !state.board[targetRank + direction][pos.file]) {
+				moves.push(createMove(pos, SQUARE_POSITIONS[(targetRank + direction) * 8 + pos.file]));
 			}
 		}
 	}
 
 	// Captures (including en passant)
-	for (const fileOffset of [-1, 1]) {
-		const capturePos: Position = { rank: pos.rank + direction, file: pos.file + fileOffset };
-		if (!isValidPosition(capturePos)) {
+	for (const fileOffset of PAWN_CAPTURE_FILE_OFFSETS) {
+		const targetFile = pos.file + fileOffset;
+		if (targetFile < 0 || targetFile > 7) {
 			continue;
 		}
 
-		const targetPiece = getPieceAt(state.board, capturePos);
-		const isEnPassant = state.enPassantTarget &&
-			capturePos.rank === state.enPassantTarget.rank &&
-			capturePos.file === state.enPassantTarget.file;
+		const targetPiece = state.board[targetRank][targetFile];
+		const isEnPassant = state.enPassantTarget !== null &&
+			targetRank === state.enPassantTarget.rank &&
+			targetFile === state.enPassantTarget.file;
 
 		if ((targetPiece && targetPiece.color !== color) || isEnPassant) {
-			if (capturePos.rank === promotionRank) {
-				for (const promotion of ['queen', 'rook', 'bishop', 'knight'] as PieceType[]) {
-					moves.push({ from: pos, to: capturePos, promotion, isCapture: true, isEnPassant });
+			const capturePos = SQUARE_POSITIONS[targetRank * 8 + targetFile];
+			if (targetRank === promotionRank) {
+				for (const promotion of PROMOTION_PIECES) {
+					moves.push(createMove(pos, capturePos, true, promotion, isEnPassant));
 				}
 			} else {
-				moves.push({ from: pos, to: capturePos, isCapture: true, isEnPassant });
+				moves.push(createMove(pos, capturePos, true, undefined, isEnPassant));
 			}
 		}
 	}
-
-	return moves;
 }
 
 /**
  * Generates all knight moves from a position
  */
-function generateKnightMoves(state: GameState, pos: Position, color: Color): Move[] {
-	const moves: Move[] = [];
-	const offsets = [
-		{ rank: 2, file: 1 }, { rank: 2, file: -1 },
-		{ rank: -2, file: 1 }, { rank: -2, file: -1 },
-		{ rank: 1, file: 2 }, { rank: 1, file: -2 },
-		{ rank: -1, file: 2 }, { rank: -1, file: -2 },
-	];
-
-	for (const offset of offsets) {
-		const newPos: Position = { rank: pos.rank + offset.rank, file: pos.file + offset.file };
-		if (isValidPosition(newPos)) {
-			const targetPiece = getPieceAt(state.board, newPos);
-			if (!targetPiece || targetPiece.color !== color) {
-				moves.push({
-					from: pos,
-					to: newPos,
-					isCapture: targetPiece !== null,
-				});
-			}
+function generateKnightMoves(state: GameState, pos: Position, color: Color, moves: Move[]): void {
+	for (const to of KNIGHT_NEIGHBORS[pos.rank * 8 + pos.file]) {
+		const targetPiece = state.board[to >> 3][to & 7];
+		if (!targetPiece || targetPiece.color !== color) {
+			moves.push(createMove(pos, SQUARE_POSITIONS[to], targetPiece !== null));
 		}
 	}
-
-	return moves;
 }
 
 /**
@@ -327,141 +573,262 @@ function generateSlidingMoves(
 	state: GameState,
 	pos: Position,
 	color: Color,
-	directions: { rank: number; file: number }[]
-): Move[] {
-	const moves: Move[] = [];
-
+	directions: readonly Direction[],
+	moves: Move[]
+): void {
 	for (const dir of directions) {
-		let currentPos: Position = { rank: pos.rank + dir.rank, file: pos.file + dir.file };
+		let rank = pos.rank + dir.rank;
+		let file = pos.file + dir.file;
 
-		while (isValidPosition(currentPos)) {
-			const targetPiece = getPieceAt(state.board, currentPos);
+		while (rank >= 0 && rank < 8 && file >= 0 && file < 8) {
+			const targetPiece = state.board[rank][file];
 
 			if (!targetPiece) {
-				moves.push({ from: pos, to: currentPos });
+				moves.push(createMove(pos, SQUARE_POSITIONS[rank * 8 + file]));
 			} else if (targetPiece.color !== color) {
-				moves.push({ from: pos, to: currentPos, isCapture: true });
+				moves.push(createMove(pos, SQUARE_POSITIONS[rank * 8 + file], true));
 				break;
 			} else {
 				break;
 			}
 
-			currentPos = { rank: currentPos.rank + dir.rank, file: currentPos.file + dir.file };
+			rank += dir.rank;
+			file += dir.file;
 		}
 	}
-
-	return moves;
 }
 
 /**
  * Generates all bishop moves from a position
  */
-function generateBishopMoves(state: GameState, pos: Position, color: Color): Move[] {
-	const diagonalDirs = [
-		{ rank: 1, file: 1 }, { rank: 1, file: -1 },
-		{ rank: -1, file: 1 }, { rank: -1, file: -1 },
-	];
-	return generateSlidingMoves(state, pos, color, diagonalDirs);
+function generateBishopMoves(state: GameState, pos: Position, color: Color, moves: Move[]): void {
+	generateSlidingMoves(state, pos, color, DIAGONAL_DIRECTIONS, moves);
 }
 
 /**
  * Generates all rook moves from a position
  */
-function generateRookMoves(state: GameState, pos: Position, color: Color): Move[] {
-	const straightDirs = [
-		{ rank: 1, file: 0 }, { rank: -1, file: 0 },
-		{ rank: 0, file: 1 }, { rank: 0, file: -1 },
-	];
-	return generateSlidingMoves(state, pos, color, straightDirs);
+function generateRookMoves(state: GameState, pos: Position, color: Color, moves: Move[]): void {
+	generateSlidingMoves(state, pos, color, STRAIGHT_DIRECTIONS, moves);
 }
 
 /**
  * Generates all queen moves from a position
  */
-function generateQueenMoves(state: GameState, pos: Position, color: Color): Move[] {
-	const allDirs = [
-		{ rank: 1, file: 0 }, { rank: -1, file: 0 },
-		{ rank: 0, file: 1 }, { rank: 0, file: -1 },
-		{ rank: 1, file: 1 }, { rank: 1, file: -1 },
-		{ rank: -1, file: 1 }, { rank: -1, file: -1 },
-	];
-	return generateSlidingMoves(state, pos, color, allDirs);
+function generateQueenMoves(state: GameState, pos: Position, color: Color, moves: Move[]): void {
+	generateSlidingMoves(state, pos, color, ALL_DIRECTIONS, moves);
 }
 
 /**
  * Generates all king moves from a position (including castling)
  */
-function generateKingMoves(state: GameState, pos: Position, color: Color): Move[] {
-	const moves: Move[] = [];
-	const offsets = [
-		{ rank: 1, file: 0 }, { rank: -1, file: 0 },
-		{ rank: 0, file: 1 }, { rank: 0, file: -1 },
-		{ rank: 1, file: 1 }, { rank: 1, file: -1 },
-		{ rank: -1, file: 1 }, { rank: -1, file: -1 },
-	];
-
+function generateKingMoves(state: GameState, pos: Position, color: Color, moves: Move[]): void {
 	// Regular king moves
-	for (const offset of offsets) {
-		const newPos: Position = { rank: pos.rank + offset.rank, file: pos.file + offset.file };
-		if (isValidPosition(newPos)) {
-			const targetPiece = getPieceAt(state.board, newPos);
-			if (!targetPiece || targetPiece.color !== color) {
-				moves.push({
-					from: pos,
-					to: newPos,
-					isCapture: targetPiece !== null,
-				});
-			}
+	for (const to of KING_NEIGHBORS[pos.rank * 8 + pos.file]) {
+		const targetPiece = state.board[to >> 3][to & 7];
+		if (!targetPiece || targetPiece.color !== color) {
+			moves.push(createMove(pos, SQUARE_POSITIONS[to], targetPiece !== null));
 		}
 	}
 
-	// Castling (simplified check - doesn't verify if squares are attacked)
+	// Castling; filterLegalMoves checks the squares the king starts on and crosses
 	const baseRank = color === 'white' ? 0 : 7;
 	if (pos.rank === baseRank && pos.file === 4) {
 		const kingside = color === 'white' ? state.castlingRights.whiteKingside : state.castlingRights.blackKingside;
 		const queenside = color === 'white' ? state.castlingRights.whiteQueenside : state.castlingRights.blackQueenside;
 
-		if (kingside) {
-			const f1 = getPieceAt(state.board, { rank: baseRank, file: 5 });
-			const g1 = getPieceAt(state.board, { rank: baseRank, file: 6 });
-			if (!f1 && !g1) {
-				moves.push({ from: pos, to: { rank: baseRank, file: 6 }, isCastle: true });
-			}
+		const row = state.board[baseRank];
+		if (kingside && isRookOf(row[7], color) && !row[5] && !row[6]) {
+			moves.push(createMove(pos, SQUARE_POSITIONS[baseRank * 8 + 6], false, undefined, false, true));
 		}
+		if (queenside && isRookOf(row[0], color) && !row[3] && !row[2] && !row[1]) {
+			moves.push(createMove(pos, SQUARE_POSITIONS[baseRank * 8 + 2], false, undefined, false, true));
+		}
+	}
+}
+
+/**
+ * Tests whether a square's occupant is a rook of the given color: castling needs
+ * its rook on the corner, whatever the castling rights say
+ */
+function isRookOf(piece: Piece | null, color: Color): boolean {
+	return piece !== null && piece.type === 'rook' && piece.color === color;
+}
+
+/** Rays from the king used for pin detection, with the slider types that pin along them */
+const PIN_RAYS: readonly { readonly rank: number; readonly file: number; readonly slider: PieceType }[] = [
+	{ rank: 1, file: 0, slider: 'rook' }, { rank: -1, file: 0, slider: 'rook' },
+	{ rank: 0, file: 1, slider: 'rook' }, { rank: 0, file: -1, slider: 'rook' },
+	{ rank: 1, file: 1, slider: 'bishop' }, { rank: 1, file: -1, slider: 'bishop' },
+	{ rank: -1, file: 1, slider: 'bishop' }, { rank: -1, file: -1, slider: 'bishop' },
+];
 
-		if (queenside) {
-			const d1 = getPieceAt(state.board, { rank: baseRank, file: 3 });
-			const c1 = getPieceAt(state.board, { rank: baseRank, file: 2 });
-			const b1 = getPieceAt(state.board, { rank: baseRank, file: 1 });
-			if (!d1 && !c1 && !b1) {
-				moves.push({ from: pos, to: { rank: baseRank, file: 2 }, isCastle: true });
+/** Per-square pin flags filled by findPinnedPieces, allocated once and reused */
+const pinnedSquares = new Uint8Array(64);
+
+/**
+ * Finds the pieces of a color that are pinned to their king.
+ * Returns a per-square flag array indexed by (rank * 8 + file). The array is
+ * shared and only valid until the next call.
+ */
+function findPinnedPieces(board: Board, kingPos: Position, color: Color): Uint8Array {
+	const pinned = pinnedSquares;
+	pinned.fill(0);
+
+	for (const ray of PIN_RAYS) {
+		let rank = kingPos.rank + ray.rank;
+		let file = kingPos.file + ray.file;
+		let candidate = -1;
+
+		while (rank >= 0 && rank < 8 && file >= 0 && file < 8) {
+			const piece = board[rank][file];
+			if (piece) {
+				if (piece.color === color) {
+					if (candidate !== -1) {
+						break; // Two own pieces on the ray - nothing is pinned
+					}
+					candidate = rank * 8 + file;
+				} else {
+					if (candidate !== -1 && (piece.type === ray.slider || piece.type === 'queen')) {
+						pinned[candidate] = 1;
+					}
+					break;
+				}
 			}
+			rank += ray.rank;
+			file += ray.file;
 		}
 	}
 
-	return moves;
+	return pinned;
 }
 
 /**
  * Generates all legal moves for the current player
  */
 export function generateAllMoves(state: GameState): Move[] {
+	return generateLegalMoves(state, findKing(state.board, state.currentPlayer));
+}
+
+/**
+ * Generates all legal moves for the current player, whose king is already known
+ * to stand on `kingPos`
+ */
+function generateLegalMoves(state: GameState, kingPos: Position | null): Move[] {
 	const moves: Move[] = [];
 
 	for (let rank = 0; rank < 8; rank++) {
 		for (let file = 0; file < 8; file++) {
 			const piece = state.board[rank][file];
 			if (piece && piece.color === state.currentPlayer) {
-				moves.push(...generatePieceMoves(state, { rank, file }));
+				addPieceMoves(state, SQUARE_POSITIONS[rank * 8 + file], piece, moves);
 			}
 		}
 	}
 
-	// Filter out moves that leave own king in check
-	return moves.filter(move => {
-		const newState = applyMove(state, move);
-		return !isKingInCheck(newState.board, state.currentPlayer);
-	});
+	if (!kingPos) {
+		return moves;
+	}
+	return filterLegalMoves(state, moves, kingPos, isSquareAttacked(state.board, kingPos, getOpponentColor(state.currentPlayer)));
+}
+
+/**
+ * Removes the pseudo-legal moves that leave the mover's king, on `kingPos`, in
+ * check from `moves` and returns it. `inCheck` tells whether the king is in check
+ * before the move.
+ */
+function filterLegalMoves(state: GameState, moves: Move[], kingPos: Position, inCheck: boolean): Move[] {
+	// Check and pin state is computed once per position and shared by all moves
+	const opponent = getOpponentColor(state.currentPlayer);
+	const pinned = findPinnedPieces(state.board, kingPos, state.currentPlayer);
+
+	// Filter out moves that leave own king in check, compacting the list in place.
+	// Only king moves, en passant, pinned pieces and evasions can do that, so only
+	// those are verified. Outside of check a pinned piece is settled by geometry
+	// alone, without playing the move. Castling also needs the king out of check
+	// and the square it crosses unattacked.
+	let legalCount = 0;
+	for (let i = 0; i < moves.length; i++) {
+		const move = moves[i];
+		const isKingMove = move.from.rank === kingPos.rank && move.from.file === kingPos.file;
+		const legal = !inCheck && !isKingMove && !move.isEnPassant
+			? !pinned[move.from.rank * 8 + move.from.file] || staysOnPinLine(move, kingPos)
+			: (!move.isCastle || (!inCheck && !isSquareAttacked(state.board, SQUARE_POSITIONS[kingPos.rank * 8 + (move.from.file + move.to.file) / 2], opponent))) &&
+			!leavesKingInCheck(state.board, move, isKingMove ? move.to : kingPos, opponent);
+		if (legal) {
+			moves[legalCount++] = move;
+		}
+	}
+	moves.length = legalCount;
+	return moves;
+}
+
+/**
+ * Tests whether a pinned piece's move keeps it on the line from its king through
+ * the piece, which is exactly when the move keeps the pin covered
+ */
+function staysOnPinLine(move: Move, kingPos: Position): boolean {
+	const fromRank = move.from.rank - kingPos.rank;
+	const fromFile = move.from.file - kingPos.file;
+	const toRank = move.to.rank - kingPos.rank;
+	const toFile = move.to.file - kingPos.file;
+	return fromRank * toFile === fromFile * toRank &&
+		Math.sign(fromRank) === Math.sign(toRank) &&
+		Math.sign(fromFile) === Math.sign(toFile);
+}
+
+/**
+ * Tests whether a move would leave the mover's king (standing on `kingPos` after
+ * the move) attacked. The move is made on the board in place and taken back
+ * afterwards, which is much cheaper than cloning the whole state.
+ */
+function leavesKingInCheck(board: Board, move: Move, kingPos: Position, opponent: Color): boolean {
+	const { from, to } = move;
+	const piece = board[from.rank][from.file];
+	const captured = board[to.rank][to.file];
+	board[to.rank][to.file] = piece;
+	board[from.rank][from.file] = null;
+
+	// En passant also removes the pawn beside the destination; castling also moves the rook
+	let removed: Piece | null = null;
+	let rook: Piece | null = null;
+	const rookFromFile = to.file === 6 ? 7 : 0;
+	const rookToFile = to.file === 6 ? 5 : 3;
+	if (move.isEnPassant) {
+		removed = board[from.rank][to.file];
+		board[from.rank][to.file] = null;
+	} else if (move.isCastle) {
+		rook = board[from.rank][rookFromFile];
+		board[from.rank][rookToFile] = rook;
+		board[from.rank][rookFromFile] = null;
+	}
+
+	const inCheck = isSquareAttacked(board, kingPos, opponent);
+
+	if (move.isEnPassant) {
+		board[from.rank][to.file] = removed;
+	} else if (move.isCastle) {
+		board[from.rank][rookFromFile] = rook;
+		board[from.rank][rookToFile] = null;
+	}
+	board[from.rank][from.file] = piece;
+	board[to.rank][to.file] = captured;
+
+	return inCheck;
+}
+
+/**
+ * Gets the type of piece a generated move captures, or null for quiet moves.
+ * Reads the target square directly; en passant (empty target) is the only special case.
+ */
+function getCapturedPieceType(board: Board, move: Move): PieceType | null {
+	if (!move.isCapture) {
+		return null;
+	}
+	if (move.isEnPassant) {
+		return 'pawn';
+	}
+	return board[move.to.rank][move.to.file]?.type ?? null;
 }
 
 // ============================================================================
@@ -479,73 +846,61 @@ export function applyMove(state: GameState, move: Move): GameState {
 		throw new Error('No piece at move source');
 	}
 
-	// Handle castling
+	const newState = createChildState(state, move, piece, newBoard);
+	placeMove(newBoard, move, piece);
+	return newState;
+}
+
+/**
+ * Makes a move on a board in place: moves the piece (promoting it, if the move is
+ * a promotion) and, for castling and en passant, the rook or the captured pawn
+ */
+function placeMove(board: Board, move: Move, piece: Piece): void {
+	const { from, to } = move;
+	board[to.rank][to.file] = move.promotion ? { type: move.promotion, color: piece.color } : piece;
+	board[from.rank][from.file] = null;
+
 	if (move.isCastle) {
-		const isKingside = move.to.file === 6;
+		const isKingside = to.file === 6;
 		const rookFromFile = isKingside ? 7 : 0;
 		const rookToFile = isKingside ? 5 : 3;
-
-		// Move king
-		newBoard[move.to.rank][move.to.file] = piece;
-		newBoard[move.from.rank][move.from.file] = null;
-
-		// Move rook
-		const rook = newBoard[move.from.rank][rookFromFile];
-		newBoard[move.from.rank][rookToFile] = rook;
-		newBoard[move.from.rank][rookFromFile] = null;
-	}
-	// Handle en passant
-	else if (move.isEnPassant) {
-		newBoard[move.to.rank][move.to.file] = piece;
-		newBoard[move.from.rank][move.from.file] = null;
-		// Remove captured pawn
-		const capturedPawnRank = state.currentPlayer === 'white' ? move.to.rank - 1 : move.to.rank + 1;
-		newBoard[capturedPawnRank][move.to.file] = null;
-	}
-	// Handle promotion
-	else if (move.promotion) {
-		newBoard[move.to.rank][move.to.file] = { type: move.promotion, color: piece.color };
-		newBoard[move.from.rank][move.from.file] = null;
-	}
-	// Regular move
-	else {
-		newBoard[move.to.rank][move.to.file] = piece;
-		newBoard[move.from.rank][move.from.file] = null;
-	}
-
-	// Update castling rights
-	let newCastlingRights = { ...state.castlingRights };
-	if (piece.type === 'king') {
-		if (piece.color === 'white') {
-			newCastlingRights.whiteKingside = false;
-			newCastlingRights.whiteQueenside = false;
-		} else {
-			newCastlingRights.blackKingside = false;
-			newCastlingRights.blackQueenside = false;
-		}
+		board[from.rank][rookToFile] = board[from.rank][rookFromFile];
+		board[from.rank][rookFromFile] = null;
+	} else if (move.isEnPassant) {
+		// The captured pawn stands beside the moving pawn, on its starting rank
+		board[from.rank][to.file] = null;
 	}
-	if (piece.type === 'rook') {
-		if (move.from.rank === 0 && move.from.file === 0) {
-			newCastlingRights.whiteQueenside = false;
-		}
-		if (move.from.rank === 0 && move.from.file === 7) {
-			newCastlingRights.whiteKingside = false;
-		}
-		if (move.from.rank === 7 && move.from.file === 0) {
-			newCastlingRights.blackQueenside = false;
-		}
-		if (move.from.rank === 7 && move.from.file === 7) {
-			newCastlingRights.blackKingside = false;
-		}
+}
+
+/**
+ * Builds the state after a move (castling rights, en passant target, clocks and
+ * side to move) around `board`, the board the move is made on. Reads the board
+ * of `state` as it was before the move.
+ */
+function createChildState(state: GameState, move: Move, piece: Piece, board: Board): GameState {
+	// Update castling rights: a right is lost when the king moves, and when a move
+	// leaves or lands on the rook's home corner (the rook moved or was captured).
+	// Rights are immutable, so the child shares its parent's object unless a right
+	// is taken away.
+	const rights = state.castlingRights;
+	let newCastlingRights = rights;
+	const from = move.from.rank * 8 + move.from.file;
+	const to = move.to.rank * 8 + move.to.file;
+	const whiteKing = piece.type === 'king' && piece.color === 'white';
+	const blackKing = piece.type === 'king' && piece.color === 'black';
+	const whiteKingside = rights.whiteKingside && !whiteKing && from !== 7 && to !== 7;
+	const whiteQueenside = rights.whiteQueenside && !whiteKing && from !== 0 && to !== 0;
+	const blackKingside = rights.blackKingside && !blackKing && from !== 63 && to !== 63;
+	const blackQueenside = rights.blackQueenside && !blackKing && from !== 56 && to !== 56;
+	if (whiteKingside !== rights.whiteKingside || whiteQueenside !== rights.whiteQueenside ||
+		blackKingside !== rights.blackKingside || blackQueenside !== rights.blackQueenside) {
+		newCastlingRights = { whiteKingside, whiteQueenside, blackKingside, blackQueenside };
 	}
 
-	// Update en passant target
+	// Update en passant target (the shared position object of the skipped square)
 	let newEnPassantTarget: Position | null = null;
 	if (piece.type === 'pawn' && Math.abs(move.to.rank - move.from.rank) === 2) {
-		newEnPassantTarget = {
-			rank: (move.from.rank + move.to.rank) / 2,
-			file: move.from.file,
-		};
+		newEnPassantTarget = SQUARE_POSITIONS[((move.from.rank + move.to.rank) >> 1) * 8 + move.from.file];
 	}
 
 	// Update move clocks
@@ -555,7 +910,7 @@ export function applyMove(state: GameState, move: Move): GameState {
 	const newFullMoveNumber = state.currentPlayer === 'black' ? state.fullMoveNumber + 1 : state.fullMoveNumber;
 
 	return {
-		board: newBoard,
+		board,
 		currentPlayer: getOpponentColor(state.currentPlayer),
 		castlingRights: newCastlingRights,
 		enPassantTarget: newEnPassantTarget,
@@ -583,90 +938,110 @@ export function findKing(board: Board, color: Color): Position | null {
 	return null;
 }
 
+/**
+ * For every square, lists the squares (rank * 8 + file) reached by the given
+ * offsets that stay on the board
+ */
+function buildNeighborSquares(offsets: readonly Direction[]): readonly (readonly number[])[] {
+	const neighbors: number[][] = [];
+	for (let square = 0; square < 64; square++) {
+		const rank = square >> 3;
+		const file = square & 7;
+		neighbors.push(offsets
+			.filter(offset => isValidPosition({ rank: rank + offset.rank, file: file + offset.file }))
+			.map(offset => (rank + offset.rank) * 8 + file + offset.file));
+	}
+	return neighbors;
+}
+
+/** Squares a knight attacks a square from */
+const KNIGHT_NEIGHBORS = buildNeighborSquares(KNIGHT_OFFSETS);
+
+/** Squares a king attacks a square from */
+const KING_NEIGHBORS = buildNeighborSquares(ALL_DIRECTIONS);
+
+/** Squares a pawn of each color attacks a square from */
+const PAWN_ATTACKER_SQUARES: Record<Color, readonly (readonly number[])[]> = {
+	white: buildNeighborSquares(PAWN_CAPTURE_FILE_OFFSETS.map(file => ({ rank: -1, file }))),
+	black: buildNeighborSquares(PAWN_CAPTURE_FILE_OFFSETS.map(file => ({ rank: 1, file }))),
+};
+
+/** The neighbor lists above as bitboards, for testing many attackers with one AND */
+const [KNIGHT_ATTACKER_MASK_LO, KNIGHT_ATTACKER_MASK_HI] = buildSquareMasks((target, square) => KNIGHT_NEIGHBORS[target].includes(square));
+const [KING_ATTACKER_MASK_LO, KING_ATTACKER_MASK_HI] = buildSquareMasks((target, square) => KING_NEIGHBORS[target].includes(square));
+const [WHITE_PAWN_ATTACKER_MASK_LO, WHITE_PAWN_ATTACKER_MASK_HI] = buildSquareMasks(
+	(target, square) => PAWN_ATTACKER_SQUARES.white[target].includes(square)
+);
+const [BLACK_PAWN_ATTACKER_MASK_LO, BLACK_PAWN_ATTACKER_MASK_HI] = buildSquareMasks(
+	(target, square) => PAWN_ATTACKER_SQUARES.black[target].includes(square)
+);
+
+/**
+ * Squares sharing a rank or file (straight) or a diagonal with a square, the
+ * square itself excluded: the only squares a slider can attack it from
+ */
+const [STRAIGHT_LINE_MASK_LO, STRAIGHT_LINE_MASK_HI] = buildSquareMasks(
+	(target, square) => target !== square && ((target >> 3) === (square >> 3) || (target & 7) === (square & 7))
+);
+const [DIAGONAL_LINE_MASK_LO, DIAGONAL_LINE_MASK_HI] = buildSquareMasks(
+	(target, square) => target !== square && Math.abs((target >> 3) - (square >> 3)) === Math.abs((target & 7) - (square & 7))
+);
+
 /**
  * Checks if a square is attacked by a given color
  */
 export function isSquareAttacked(board: Board, pos: Position, byColor: Color): boolean {
+	const square = pos.rank * 8 + pos.file;
+
 	// Check pawn attacks
-	const pawnDirection = byColor === 'white' ? 1 : -1;
-	for (const fileOffset of [-1, 1]) {
-		const attackerPos: Position = { rank: pos.rank - pawnDirection, file: pos.file + fileOffset };
-		if (isValidPosition(attackerPos)) {
-			const piece = getPieceAt(board, attackerPos);
-			if (piece && piece.type === 'pawn' && piece.color === byColor) {
-				return true;
-			}
+	for (const from of PAWN_ATTACKER_SQUARES[byColor][square]) {
+		const piece = board[from >> 3][from & 7];
+		if (piece && piece.type === 'pawn' && piece.color === byColor) {
+			return true;
 		}
 	}
 
 	// Check knight attacks
-	const knightOffsets = [
-		{ rank: 2, file: 1 }, { rank: 2, file: -1 },
-		{ rank: -2, file: 1 }, { rank: -2, file: -1 },
-		{ rank: 1, file: 2 }, { rank: 1, file: -2 },
-		{ rank: -1, file: 2 }, { rank: -1, file: -2 },
-	];
-	for (const offset of knightOffsets) {
-		const attackerPos: Position = { rank: pos.rank + offset.rank, file: pos.file + offset.file };
-		if (isValidPosition(attackerPos)) {
-			const piece = getPieceAt(board, attackerPos);
-			if (piece && piece.type === 'knight' && piece.color === byColor) {
-				return true;
-			}
+	for (const from of KNIGHT_NEIGHBORS[square]) {
+		const piece = board[from >> 3][from & 7];
+		if (piece && piece.type === 'knight' && piece.color === byColor) {
+			return true;
 		}
 	}
 
 	// Check king attacks (for adjacent squares)
-	const kingOffsets = [
-		{ rank: 1, file: 0 }, { rank: -1, file: 0 },
-		{ rank: 0, file: 1 }, { rank: 0, file: -1 },
-		{ rank: 1, file: 1 }, { rank: 1, file: -1 },
-		{ rank: -1, file: 1 }, { rank: -1, file: -1 },
-	];
-	for (const offset of kingOffsets) {
-		const attackerPos: Position = { rank: pos.rank + offset.rank, file: pos.file + offset.file };
-		if (isValidPosition(attackerPos)) {
-			const piece = getPieceAt(board, attackerPos);
-			if (piece && piece.type === 'king' && piece.color === byColor) {
-				return true;
-			}
+	for (const from of KING_NEIGHBORS[square]) {
+		const piece = board[from >> 3][from & 7];
+		if (piece && piece.type === 'king' && piece.color === byColor) {
+			return true;
 		}
 	}
 
 	// Check sliding piece attacks (rook, bishop, queen)
-	const directions = {
-		straight: [{ rank: 1, file: 0 }, { rank: -1, file: 0 }, { rank: 0, file: 1 }, { rank: 0, file: -1 }],
-		diagonal: [{ rank: 1, file: 1 }, { rank: 1, file: -1 }, { rank: -1, file: 1 }, { rank: -1, file: -1 }],
-	};
-
-	for (const dir of directions.straight) {
-		let checkPos: Position = { rank: pos.rank + dir.rank, file: pos.file + dir.file };
-		while (isValidPosition(checkPos)) {
-			const piece = getPieceAt(board, checkPos);
-			if (piece) {
-				if (piece.color === byColor && (piece.type === 'rook' || piece.type === 'queen')) {
-					return true;
-				}
-				break;
-			}
-			checkPos = { rank: checkPos.rank + dir.rank, file: checkPos.file + dir.file };
-		}
-	}
+	return isAttackedAlongRays(board, pos, byColor, STRAIGHT_DIRECTIONS, 'rook') ||
+		isAttackedAlongRays(board, pos, byColor, DIAGONAL_DIRECTIONS, 'bishop');
+}
 
-	for (const dir of directions.diagonal) {
-		let checkPos: Position = { rank: pos.rank + dir.rank, file: pos.file + dir.file };
-		while (isValidPosition(checkPos)) {
-			const piece = getPieceAt(board, checkPos);
+/**
+ * Checks if a square is attacked along the given rays by a slider of a given
+ * color: the queen, or `slider` (the rook on straight rays, the bishop on diagonals)
+ */
+function isAttackedAlongRays(board: Board, pos: Position, byColor: Color, directions: readonly Direction[], slider: PieceType): boolean {
+	for (const dir of directions) {
+		let rank = pos.rank + dir.rank;
+		let file = pos.file + dir.file;
+		while (rank >= 0 && rank < 8 && file >= 0 && file < 8) {
+			const piece = board[rank][file];
 			if (piece) {
-				if (piece.color === byColor && (piece.type === 'bishop' || piece.type === 'queen')) {
+				if (piece.color === byColor && (piece.type === slider || piece.type === 'queen')) {
 					return true;
 				}
 				break;
 			}
-			checkPos = { rank: checkPos.rank + dir.rank, file: checkPos.file + dir.file };
+			rank += dir.rank;
+			file += dir.file;
 		}
 	}
-
 	return false;
 }
 
@@ -682,273 +1057,1698 @@ export function isKingInCheck(board: Board, kingColor: Color): boolean {
 }
 
 // ============================================================================
-// Aggressive Evaluation Function
+// Zobrist Hashing
 // ============================================================================
 
+/** Index of each piece type within the Zobrist piece-square keys and piece-square scores */
+const PIECE_TYPE_INDEX: Record<PieceType, number> = {
+	pawn: 0,
+	knight: 1,
+	bishop: 2,
+	rook: 3,
+	queen: 4,
+	king: 5,
+};
+
+/** Piece types by PIECE_TYPE_INDEX */
+const PIECE_TYPES_BY_INDEX: readonly PieceType[] = ['pawn', 'knight', 'bishop', 'rook', 'queen', 'king'];
+
 /**
- * Counts how many squares a piece attacks
+ * Generates deterministic pseudo-random 32-bit keys (xorshift32), so hashes are
+ * stable across runs
  */
-function countAttackedSquares(state: GameState, pos: Position): number {
-	const moves = generatePieceMoves(state, pos);
-	return moves.length;
+function createZobristKeys(count: number, seed: number): Uint32Array {
+	const keys = new Uint32Array(count);
+	let x = seed;
+	for (let i = 0; i < count; i++) {
+		x ^= x << 13;
+		x ^= x >>> 17;
+		x ^= x << 5;
+		keys[i] = x;
+	}
+	return keys;
 }
 
+/** Piece-square keys indexed by ((color * 6 + pieceType) * 64 + square), low and high halves */
+const ZOBRIST_PIECE_LO = createZobristKeys(2 * 6 * 64, 0x9e3779b9);
+const ZOBRIST_PIECE_HI = createZobristKeys(2 * 6 * 64, 0x85ebca6b);
+
+/** Castling keys in the order K, Q, k, q */
+const ZOBRIST_CASTLING_LO = createZobristKeys(4, 0xc2b2ae35);
+const ZOBRIST_CASTLING_HI = createZobristKeys(4, 0x27d4eb2f);
+
+/** En passant keys indexed by target file */
+const ZOBRIST_EN_PASSANT_LO = createZobristKeys(8, 0x165667b1);
+const ZOBRIST_EN_PASSANT_HI = createZobristKeys(8, 0xd3a2646c);
+
+/** Side-to-move key, applied when black is to move */
+const ZOBRIST_BLACK_TO_MOVE_LO = createZobristKeys(1, 0xfd7046c5)[0];
+const ZOBRIST_BLACK_TO_MOVE_HI = createZobristKeys(1, 0xb55a4f09)[0];
+
 /**
- * Evaluates if a pawn is a passed pawn
+ * Gets the index of a piece standing on a square within the Zobrist piece-square keys
  */
-function isPassedPawn(board: Board, pos: Position, color: Color): boolean {
-	const direction = color === 'white' ? 1 : -1;
-	const endRank = color === 'white' ? 7 : 0;
-
-	// Check if there are any opponent pawns that can block or capture this pawn
-	for (let rank = pos.rank + direction; rank !== endRank + direction; rank += direction) {
-		for (let file = Math.max(0, pos.file - 1); file <= Math.min(7, pos.file + 1); file++) {
-			const piece = board[rank][file];
-			if (piece && piece.type === 'pawn' && piece.color !== color) {
-				return false;
-			}
-		}
-	}
-	return true;
+function zobristPieceIndex(piece: Piece, square: number): number {
+	return ((piece.color === 'white' ? 0 : 6) + PIECE_TYPE_INDEX[piece.type]) * 64 + square;
 }
 
 /**
- * Counts doubled pawns for a color
+ * Packs castling rights into a 4-bit mask in Zobrist key order (K, Q, k, q)
  */
-function countDoubledPawns(board: Board, color: Color): number {
-	let doubled = 0;
-
-	for (let file = 0; file < 8; file++) {
-		let pawnsOnFile = 0;
-		for (let rank = 0; rank < 8; rank++) {
-			const piece = board[rank][file];
-			if (piece && piece.type === 'pawn' && piece.color === color) {
-				pawnsOnFile++;
-			}
-		}
-		if (pawnsOnFile > 1) {
-			doubled += pawnsOnFile - 1;
-		}
-	}
-
-	return doubled;
+function castlingRightsMask(rights: CastlingRights): number {
+	return (rights.whiteKingside ? 1 : 0) |
+		(rights.whiteQueenside ? 2 : 0) |
+		(rights.blackKingside ? 4 : 0) |
+		(rights.blackQueenside ? 8 : 0);
 }
 
 /**
- * Checks if a file is open (no pawns)
+ * Combines the two 32-bit hash halves into a 53-bit integer key
+ * (safe to use as a Map key without string conversion)
  */
-function isOpenFile(board: Board, file: number): boolean {
-	for (let rank = 0; rank < 8; rank++) {
-		const piece = board[rank][file];
-		if (piece && piece.type === 'pawn') {
-			return false;
-		}
-	}
-	return true;
+function toZobristKey(lo: number, hi: number): number {
+	return (hi & 0x1fffff) * 0x100000000 + (lo >>> 0);
 }
 
 /**
- * AGGRESSIVE evaluation function that rewards:
- * - Material advantage
- * - Central control
- * - Piece activity and mobility
- * - Attacking opponent pieces
- * - Advanced pawns
- * - Checks
+ * Computes the two 32-bit halves of a game state's Zobrist hash from scratch
  */
-export function evaluatePosition(state: GameState): number {
-	const board = state.board;
-	let score = 0;
-
-	let whiteBishops = 0;
-	let blackBishops = 0;
+function computeZobristHalves(state: GameState): [number, number] {
+	let lo = 0;
+	let hi = 0;
 
 	for (let rank = 0; rank < 8; rank++) {
 		for (let file = 0; file < 8; file++) {
-			const piece = board[rank][file];
-			if (!piece) {
-				continue;
+			const piece = state.board[rank][file];
+			if (piece) {
+				const index = zobristPieceIndex(piece, rank * 8 + file);
+				lo ^= ZOBRIST_PIECE_LO[index];
+				hi ^= ZOBRIST_PIECE_HI[index];
 			}
+		}
+	}
 
-			const sign = piece.color === 'white' ? 1 : -1;
-			const pos: Position = { rank, file };
+	const castling = castlingRightsMask(state.castlingRights);
+	for (let i = 0; i < 4; i++) {
+		if (castling & (1 << i)) {
+			lo ^= ZOBRIST_CASTLING_LO[i];
+			hi ^= ZOBRIST_CASTLING_HI[i];
+		}
+	}
 
-			// Material value
-			score += sign * PIECE_VALUES[piece.type];
+	if (state.enPassantTarget) {
+		lo ^= ZOBRIST_EN_PASSANT_LO[state.enPassantTarget.file];
+		hi ^= ZOBRIST_EN_PASSANT_HI[state.enPassantTarget.file];
+	}
 
-			// Count bishops for bishop pair bonus
-			if (piece.type === 'bishop') {
-				if (piece.color === 'white') {
-					whiteBishops++;
-				} else {
-					blackBishops++;
-				}
-			}
+	if (state.currentPlayer === 'black') {
+		lo ^= ZOBRIST_BLACK_TO_MOVE_LO;
+		hi ^= ZOBRIST_BLACK_TO_MOVE_HI;
+	}
+
+	return [lo, hi];
+}
+
+/**
+ * Computes the Zobrist hash of a game state as a 53-bit integer
+ */
+export function computeZobristHash(state: GameState): number {
+	const [lo, hi] = computeZobristHalves(state);
+	return toZobristKey(lo, hi);
+}
+
+// ============================================================================
+// Aggressive Evaluation Function
+// ============================================================================
+
+/**
+ * Evaluates if a pawn is a passed pawn: no opponent pawn (given as a bitboard)
+ * can block or capture it on its way to promotion
+ */
+function isPassedPawn(square: number, color: Color, enemyPawnsLo: number, enemyPawnsHi: number): boolean {
+	if (color === 'white') {
+		return (enemyPawnsLo & WHITE_PASSED_MASK_LO[square]) === 0 && (enemyPawnsHi & WHITE_PASSED_MASK_HI[square]) === 0;
+	}
+	return (enemyPawnsLo & BLACK_PASSED_MASK_LO[square]) === 0 && (enemyPawnsHi & BLACK_PASSED_MASK_HI[square]) === 0;
+}
+
+/**
+ * Counts doubled pawns in a bitboard of one color's pawns: every pawn beyond the
+ * first on its file. That is the pawn count minus the number of files with a pawn,
+ * found by folding the eight ranks onto one byte.
+ */
+function countDoubledPawns(pawnsLo: number, pawnsHi: number): number {
+	let files = pawnsLo | pawnsHi;
+	files |= files >>> 16;
+	files |= files >>> 8;
+	return countSquares(pawnsLo, pawnsHi) - countBits(files & 0xff);
+}
+
+/**
+ * Checks if the file of a square is open (no pawns), given the bitboard of all pawns
+ */
+function isOpenFile(pawnsLo: number, pawnsHi: number, square: number): boolean {
+	return (pawnsLo & FILE_MASK_LO[square]) === 0 && (pawnsHi & FILE_MASK_HI[square]) === 0;
+}
+
+/**
+ * Builds the static per-square score of one piece of the given type and color,
+ * indexed by square = rank * 8 + file: material, center control and advancement
+ * (counted from the color's own side). Scores are positive for both colors and
+ * fit in 16 bits.
+ */
+function buildPieceSquareTable(type: PieceType, color: Color): Int16Array {
+	const table = new Int16Array(64);
+
+	for (let rank = 0; rank < 8; rank++) {
+		for (let file = 0; file < 8; file++) {
+			const square = rank * 8 + file;
+
+			// Material value
+			let value = PIECE_VALUES[type];
+
+			// Center control bonus (aggressive players love the center!)
+			if (hasSquare(CENTER_LO, CENTER_HI, square)) {
+				value += CENTER_CONTROL_BONUS;
+			} else if (hasSquare(EXTENDED_CENTER_LO, EXTENDED_CENTER_HI, square)) {
+				value += EXTENDED_CENTER_BONUS;
+			}
+
+			// Piece advancement bonus (push forward aggressively!)
+			if (type !== 'king') {
+				value += (color === 'white' ? rank : 7 - rank) * ADVANCEMENT_BONUS_PER_RANK;
+			}
+
+			table[square] = value;
+		}
+	}
+
+	return table;
+}
+
+/**
+ * Static piece-square scores of every piece, flat and indexed like the Zobrist
+ * piece keys ((colorOffset + typeIndex) * 64 + square). Black scores are negated,
+ * so each entry is already from white's point of view and needs no color branch.
+ */
+const PIECE_SQUARE_SCORES = buildPieceSquareScores();
+
+function buildPieceSquareScores(): Int16Array {
+	const scores = new Int16Array(12 * 64);
+	for (const type of Object.keys(PIECE_TYPE_INDEX) as PieceType[]) {
+		const white = buildPieceSquareTable(type, 'white');
+		const black = buildPieceSquareTable(type, 'black');
+		for (let square = 0; square < 64; square++) {
+			scores[PIECE_TYPE_INDEX[type] * 64 + square] = white[square];
+			scores[(6 + PIECE_TYPE_INDEX[type]) * 64 + square] = -black[square];
+		}
+	}
+	return scores;
+}
+
+/**
+ * AGGRESSIVE evaluation function that rewards:
+ * - Material advantage
+ * - Central control
+ * - Piece activity and mobility
+ * - Attacking opponent pieces
+ * - Advanced pawns
+ * - Checks
+ */
+export function evaluatePosition(state: GameState): number {
+	const bitboards = evaluationBitboards;
+	computePieceBitboards(state.board, bitboards, 0);
+	let score = evaluatePieces(state, computePieceSquareScore(bitboards, 0), bitboards, 0);
+
+	// Check bonus (aggressive player loves giving checks!)
+	const whiteKing = findKingSquare(bitboards, 0, 'white');
+	const blackKing = findKingSquare(bitboards, 0, 'black');
+	if (blackKing >= 0 && isSquareAttackedByPieces(state.board, bitboards, 0, blackKing, 'white')) {
+		score += CHECK_BONUS;
+	}
+	if (whiteKing >= 0 && isSquareAttackedByPieces(state.board, bitboards, 0, whiteKing, 'black')) {
+		score -= CHECK_BONUS;
+	}
+	return score;
+}
+
+/** Number of Int32 words of one set of piece bitboards (lo and hi for 12 pieces) */
+const PIECE_BITBOARD_WORDS = 24;
+
+/** Scratch piece bitboards for evaluating positions outside a search */
+const evaluationBitboards = new Int32Array(PIECE_BITBOARD_WORDS);
+
+/**
+ * Writes one bitboard per piece, indexed like the Zobrist piece keys, into
+ * `bitboards` from `offset`: piece (colorOffset + typeIndex) has its low half at
+ * offset + index * 2 and its high half right after it
+ */
+function computePieceBitboards(board: Board, bitboards: Int32Array, offset: number): void {
+	bitboards.fill(0, offset, offset + PIECE_BITBOARD_WORDS);
+	for (let square = 0; square < 64; square++) {
+		const piece = board[square >> 3][square & 7];
+		if (piece) {
+			togglePieceSquare(bitboards, offset, zobristPieceIndex(piece, 0) >> 6, square);
+		}
+	}
+}
+
+/**
+ * Adds a square to, or removes it from, the bitboard of a piece (see computePieceBitboards)
+ */
+function togglePieceSquare(bitboards: Int32Array, offset: number, pieceIndex: number, square: number): void {
+	bitboards[offset + pieceIndex * 2 + (square >> 5)] ^= 1 << (square & 31);
+}
+
+/**
+ * Checks if a square is attacked by a given color, like isSquareAttacked, using
+ * the piece bitboards: pawn, knight and king attackers are one AND each against
+ * the attacker masks, and rays are only walked when a matching slider shares a
+ * line with the square
+ */
+function isSquareAttackedByPieces(board: Board, bitboards: Int32Array, offset: number, square: number, byColor: Color): boolean {
+	const pieces = offset + (byColor === 'white' ? 0 : 6) * 2;
+	const pawns = pieces + PIECE_TYPE_INDEX.pawn * 2;
+	const knights = pieces + PIECE_TYPE_INDEX.knight * 2;
+	const kings = pieces + PIECE_TYPE_INDEX.king * 2;
+	const pawnMaskLo = byColor === 'white' ? WHITE_PAWN_ATTACKER_MASK_LO : BLACK_PAWN_ATTACKER_MASK_LO;
+	const pawnMaskHi = byColor === 'white' ? WHITE_PAWN_ATTACKER_MASK_HI : BLACK_PAWN_ATTACKER_MASK_HI;
+	if ((bitboards[pawns] & pawnMaskLo[square]) | (bitboards[pawns + 1] & pawnMaskHi[square]) ||
+		(bitboards[knights] & KNIGHT_ATTACKER_MASK_LO[square]) | (bitboards[knights + 1] & KNIGHT_ATTACKER_MASK_HI[square]) ||
+		(bitboards[kings] & KING_ATTACKER_MASK_LO[square]) | (bitboards[kings + 1] & KING_ATTACKER_MASK_HI[square])) {
+		return true;
+	}
+
+	const queens = pieces + PIECE_TYPE_INDEX.queen * 2;
+	const rooks = pieces + PIECE_TYPE_INDEX.rook * 2;
+	const bishops = pieces + PIECE_TYPE_INDEX.bishop * 2;
+	const pos = SQUARE_POSITIONS[square];
+	if ((((bitboards[rooks] | bitboards[queens]) & STRAIGHT_LINE_MASK_LO[square]) |
+		((bitboards[rooks + 1] | bitboards[queens + 1]) & STRAIGHT_LINE_MASK_HI[square])) &&
+		isAttackedAlongRays(board, pos, byColor, STRAIGHT_DIRECTIONS, 'rook')) {
+		return true;
+	}
+	return ((((bitboards[bishops] | bitboards[queens]) & DIAGONAL_LINE_MASK_LO[square]) |
+		((bitboards[bishops + 1] | bitboards[queens + 1]) & DIAGONAL_LINE_MASK_HI[square])) !== 0) &&
+		isAttackedAlongRays(board, pos, byColor, DIAGONAL_DIRECTIONS, 'bishop');
+}
+
+/**
+ * Sums the piece-square scores of every piece, from white's point of view, visiting
+ * only the occupied squares of the piece bitboards (see computePieceBitboards)
+ */
+function computePieceSquareScore(bitboards: Int32Array, offset: number): number {
+	let score = 0;
+	for (let pieceIndex = 0; pieceIndex < 12; pieceIndex++) {
+		for (let half = 0; half < 2; half++) {
+			for (let bits = bitboards[offset + pieceIndex * 2 + half]; bits !== 0; bits &= bits - 1) {
+				score += PIECE_SQUARE_SCORES[pieceIndex * 64 + half * 32 + lowestBit(bits)];
+			}
+		}
+	}
+	return score;
+}
+
+/**
+ * Returns the square of the king of a color from the piece bitboards, or -1 if it has none
+ */
+function findKingSquare(bitboards: Int32Array, offset: number, color: Color): number {
+	const kings = offset + ((color === 'white' ? 0 : 6) + PIECE_TYPE_INDEX.king) * 2;
+	if (bitboards[kings] !== 0) {
+		return lowestBit(bitboards[kings]);
+	}
+	return bitboards[kings + 1] !== 0 ? 32 + lowestBit(bitboards[kings + 1]) : -1;
+}
+
+/**
+ * Signed piece-square score of one piece on one square, from white's point of view
+ */
+function pieceSquareValue(color: Color, type: PieceType, square: number): number {
+	return PIECE_SQUARE_SCORES[((color === 'white' ? 0 : 6) + PIECE_TYPE_INDEX[type]) * 64 + square];
+}
+
+/**
+ * Evaluates everything but the check bonus for a position whose piece-square score
+ * (material, center control and advancement) and piece bitboards (see
+ * computePieceBitboards) are already known. Every per-piece term walks the
+ * bitboards, so empty squares and pieces a term does not apply to are never visited.
+ */
+function evaluatePieces(state: GameState, pieceSquareScore: number, bitboards: Int32Array, offset: number): number {
+	let score = pieceSquareScore;
+
+	const whitePawns = offset + PIECE_TYPE_INDEX.pawn * 2;
+	const blackPawns = offset + (6 + PIECE_TYPE_INDEX.pawn) * 2;
+	const whitePawnsLo = bitboards[whitePawns];
+	const whitePawnsHi = bitboards[whitePawns + 1];
+	const blackPawnsLo = bitboards[blackPawns];
+	const blackPawnsHi = bitboards[blackPawns + 1];
+	const pawnsLo = whitePawnsLo | blackPawnsLo;
+	const pawnsHi = whitePawnsHi | blackPawnsHi;
+
+	// Piece mobility (more squares attacked = more aggressive) and attacks on
+	// opponent pieces, for the side to move
+	const color = state.currentPlayer;
+	const colorOffset = color === 'white' ? 0 : 6;
+	const sign = color === 'white' ? 1 : -1;
+	const enemy = offset + (6 - colorOffset) * 2;
+	let ownLo = 0;
+	let ownHi = 0;
+	for (let typeIndex = 0; typeIndex < 6; typeIndex++) {
+		const own = offset + (colorOffset + typeIndex) * 2;
+		ownLo |= bitboards[own];
+		ownHi |= bitboards[own + 1];
+	}
+	for (let typeIndex = 0; typeIndex < 6; typeIndex++) {
+		const word = offset + (colorOffset + typeIndex) * 2;
+		const type = PIECE_TYPES_BY_INDEX[typeIndex];
+		for (let half = 0; half < 2; half++) {
+			for (let bits = bitboards[word + half]; bits !== 0; bits &= bits - 1) {
+				const square = half * 32 + lowestBit(bits);
+				score += sign * scorePieceActivity(state, square, type, color, ownLo, ownHi, bitboards, enemy);
+			}
+		}
+	}
+
+	// Passed and doubled pawns
+	score += evaluatePawnStructureCached(whitePawnsLo, whitePawnsHi, blackPawnsLo, blackPawnsHi);
+
+	// Rook on open file bonus
+	const whiteRooks = offset + PIECE_TYPE_INDEX.rook * 2;
+	const blackRooks = offset + (6 + PIECE_TYPE_INDEX.rook) * 2;
+	for (let half = 0; half < 2; half++) {
+		for (let bits = bitboards[whiteRooks + half]; bits !== 0; bits &= bits - 1) {
+			if (isOpenFile(pawnsLo, pawnsHi, half * 32 + lowestBit(bits))) {
+				score += OPEN_FILE_BONUS;
+			}
+		}
+		for (let bits = bitboards[blackRooks + half]; bits !== 0; bits &= bits - 1) {
+			if (isOpenFile(pawnsLo, pawnsHi, half * 32 + lowestBit(bits))) {
+				score -= OPEN_FILE_BONUS;
+			}
+		}
+	}
+
+	// Bishop pair bonus
+	const whiteBishops = offset + PIECE_TYPE_INDEX.bishop * 2;
+	const blackBishops = offset + (6 + PIECE_TYPE_INDEX.bishop) * 2;
+	if (countSquares(bitboards[whiteBishops], bitboards[whiteBishops + 1]) >= 2) {
+		score += BISHOP_PAIR_BONUS;
+	}
+	if (countSquares(bitboards[blackBishops], bitboards[blackBishops + 1]) >= 2) {
+		score -= BISHOP_PAIR_BONUS;
+	}
+
+	return score;
+}
+
+/**
+ * Pawn structure scores by pawn placement. The pawns change far less often than
+ * the rest of the position, so most leaves of a search share a few pawn
+ * structures. The key is the four pawn bitboard halves themselves, so a hit is
+ * exact; one slot per key hash, and a new score always replaces the old one. A
+ * zeroed slot holds the correct score (0) for a board without pawns, so no
+ * slot needs an empty marker.
+ */
+const pawnCacheKeys = new Int32Array(PAWN_CACHE_SIZE * 4);
+const pawnCacheScores = new Int32Array(PAWN_CACHE_SIZE);
+
+/**
+ * Passed pawn bonus and doubled pawn penalty of both colors, from white's point
+ * of view, through the pawn structure cache
+ */
+function evaluatePawnStructureCached(whiteLo: number, whiteHi: number, blackLo: number, blackHi: number): number {
+	const hash = Math.imul(whiteLo ^ Math.imul(whiteHi, 0x9e3779b1) ^ Math.imul(blackLo, 0x85ebca77) ^ Math.imul(blackHi, 0xc2b2ae3d), 0x27d4eb2f);
+	const slot = hash >>> (32 - PAWN_CACHE_BITS);
+	const key = slot * 4;
+	if (pawnCacheKeys[key] === whiteLo && pawnCacheKeys[key + 1] === whiteHi &&
+		pawnCacheKeys[key + 2] === blackLo && pawnCacheKeys[key + 3] === blackHi) {
+		return pawnCacheScores[slot];
+	}
+
+	const score = evaluatePawnStructure(whiteLo, whiteHi, blackLo, blackHi);
+	pawnCacheKeys[key] = whiteLo;
+	pawnCacheKeys[key + 1] = whiteHi;
+	pawnCacheKeys[key + 2] = blackLo;
+	pawnCacheKeys[key + 3] = blackHi;
+	pawnCacheScores[slot] = score;
+	return score;
+}
+
+/**
+ * Passed pawn bonus and doubled pawn penalty of both colors, from white's point of view
+ */
+function evaluatePawnStructure(whiteLo: number, whiteHi: number, blackLo: number, blackHi: number): number {
+	let score = 0;
+
+	// Passed pawn bonus
+	for (let half = 0; half < 2; half++) {
+		for (let bits = half === 0 ? whiteLo : whiteHi; bits !== 0; bits &= bits - 1) {
+			const square = half * 32 + lowestBit(bits);
+			if (isPassedPawn(square, 'white', blackLo, blackHi)) {
+				score += PASSED_PAWN_BONUS + (square >> 3) * 10;
+			}
+		}
+		for (let bits = half === 0 ? blackLo : blackHi; bits !== 0; bits &= bits - 1) {
+			const square = half * 32 + lowestBit(bits);
+			if (isPassedPawn(square, 'black', whiteLo, whiteHi)) {
+				score -= PASSED_PAWN_BONUS + (7 - (square >> 3)) * 10;
+			}
+		}
+	}
+
+	// Doubled pawn penalty
+	score += countDoubledPawns(whiteLo, whiteHi) * DOUBLED_PAWN_PENALTY;
+	score -= countDoubledPawns(blackLo, blackHi) * DOUBLED_PAWN_PENALTY;
+
+	return score;
+}
+
+/**
+ * Mobility and attack score of a piece of the side to move: MOBILITY_BONUS_PER_MOVE
+ * for each of its moves plus the attack bonus of every enemy piece it can capture.
+ * Counts exactly the moves generatePieceMoves would produce, without building them.
+ * `own` is the bitboard of the mover's pieces, and the enemy's piece bitboards
+ * start at `enemy` in `bitboards`.
+ */
+function scorePieceActivity(
+	state: GameState,
+	square: number,
+	type: PieceType,
+	color: Color,
+	ownLo: number,
+	ownHi: number,
+	bitboards: Int32Array,
+	enemy: number
+): number {
+	switch (type) {
+		case 'pawn':
+			return scorePawnActivity(state, square, color);
+		case 'knight':
+			return scoreStepActivity(bitboards, enemy, KNIGHT_ATTACKER_MASK_LO[square] & ~ownLo, KNIGHT_ATTACKER_MASK_HI[square] & ~ownHi);
+		case 'bishop':
+			return scoreSlidingActivity(state.board, square, color, DIAGONAL_DIRECTIONS);
+		case 'rook':
+			return scoreSlidingActivity(state.board, square, color, STRAIGHT_DIRECTIONS);
+		case 'queen':
+			return scoreSlidingActivity(state.board, square, color, ALL_DIRECTIONS);
+		case 'king':
+			return scoreStepActivity(bitboards, enemy, KING_ATTACKER_MASK_LO[square] & ~ownLo, KING_ATTACKER_MASK_HI[square] & ~ownHi)
+				+ countCastlingMoves(state, square, color) * MOBILITY_BONUS_PER_MOVE;
+		default:
+			return 0;
+	}
+}
+
+/**
+ * Activity score of a pawn (see scorePieceActivity). As in generatePawnMoves, each
+ * promotion piece counts as a separate move (and capture).
+ */
+function scorePawnActivity(state: GameState, square: number, color: Color): number {
+	const board = state.board;
+	const rank = square >> 3;
+	const file = square & 7;
+	const direction = color === 'white' ? 1 : -1;
+	const targetRank = rank + direction;
+	if (targetRank < 0 || targetRank > 7) {
+		return 0;
+	}
+	const movesPerTarget = targetRank === (color === 'white' ? 7 : 0) ? PROMOTION_PIECES.length : 1;
+
+	let moveCount = 0;
+	let attackBonus = 0;
+
+	// Pushes
+	if (!board[targetRank][file]) {
+		moveCount += movesPerTarget;
+		if (rank === (color === 'white' ? 1 : 6) && !board[targetRank + direction][file]) {
+			moveCount++;
+		}
+	}
+
+	// Captures (including en passant)
+	const enPassant = state.enPassantTarget;
+	for (const fileOffset of PAWN_CAPTURE_FILE_OFFSETS) {
+		const targetFile = file + fileOffset;
+		if (targetFile < 0 || targetFile > 7) {
+			continue;
+		}
+		const target = board[targetRank][targetFile];
+		const isEnPassant = enPassant !== null && enPassant.rank === targetRank && enPassant.file === targetFile;
+		if (isEnPassant || (target && target.color !== color)) {
+			moveCount += movesPerTarget;
+			attackBonus += movesPerTarget * ATTACK_BONUS_VALUES[isEnPassant ? 'pawn' : target!.type];
+		}
+	}
+
+	return moveCount * MOBILITY_BONUS_PER_MOVE + attackBonus;
+}
+
+/**
+ * Activity score of a knight or the king's regular moves (see scorePieceActivity),
+ * given the bitboard of its target squares (its neighbors not held by its own
+ * pieces): one population count for the moves, and one per enemy piece type, on
+ * the enemy's piece bitboards from `enemy`, for the attacked pieces
+ */
+function scoreStepActivity(bitboards: Int32Array, enemy: number, targetsLo: number, targetsHi: number): number {
+	let score = countSquares(targetsLo, targetsHi) * MOBILITY_BONUS_PER_MOVE;
+	for (let typeIndex = 0; typeIndex < 6; typeIndex++) {
+		const word = enemy + typeIndex * 2;
+		const attacked = countSquares(targetsLo & bitboards[word], targetsHi & bitboards[word + 1]);
+		score += attacked * ATTACK_BONUS_VALUES[PIECE_TYPES_BY_INDEX[typeIndex]];
+	}
+	return score;
+}
+
+/**
+ * Activity score of a sliding piece along the given directions (see scorePieceActivity)
+ */
+function scoreSlidingActivity(board: Board, square: number, color: Color, directions: readonly Direction[]): number {
+	let score = 0;
+	for (const dir of directions) {
+		let rank = (square >> 3) + dir.rank;
+		let file = (square & 7) + dir.file;
+		while (rank >= 0 && rank < 8 && file >= 0 && file < 8) {
+			const target = board[rank][file];
+			if (!target) {
+				score += MOBILITY_BONUS_PER_MOVE;
+			} else {
+				if (target.color !== color) {
+					score += MOBILITY_BONUS_PER_MOVE + ATTACK_BONUS_VALUES[target.type];
+				}
+				break;
+			}
+			rank += dir.rank;
+			file += dir.file;
+		}
+	}
+	return score;
+}
+
+/**
+ * Counts the castling moves generateKingMoves would produce for a king on a square.
+ * Like those moves, these are not checked for attacked squares: this only feeds
+ * the mobility term.
+ */
+function countCastlingMoves(state: GameState, square: number, color: Color): number {
+	const baseRank = color === 'white' ? 0 : 7;
+	if (square !== baseRank * 8 + 4) {
+		return 0;
+	}
+
+	const row = state.board[baseRank];
+	const rights = state.castlingRights;
+	let count = 0;
+	if ((color === 'white' ? rights.whiteKingside : rights.blackKingside) && isRookOf(row[7], color) && !row[5] && !row[6]) {
+		count++;
+	}
+	if ((color === 'white' ? rights.whiteQueenside : rights.blackQueenside) && isRookOf(row[0], color) && !row[3] && !row[2] && !row[1]) {
+		count++;
+	}
+	return count;
+}
+
+/**
+ * Static evaluations keyed by Zobrist hash. Unlike search results these are exact
+ * for a position, so repeated leaves (e.g. transposed move orders) can reuse them.
+ * Scores are integers, so they are kept as int32 in typed arrays with one slot
+ * per low hash bits; a new evaluation always replaces the slot's old one.
+ */
+interface EvaluationCache {
+	readonly keyLo: Int32Array;
+	readonly keyHi: Int32Array;
+	readonly score: Int32Array;
+	/** 0 for an empty slot, else 1 plus whether the side to move was in check */
+	readonly filled: Uint8Array;
+}
+
+/**
+ * The evaluation cache, allocated by the first search rather than on import: at
+ * EVALUATION_CACHE_SIZE slots it is the bulk of the module's memory and of its
+ * load time, which a caller using only the move generator should not pay for
+ */
+let evaluationCache: EvaluationCache | undefined;
+
+function createEvaluationCache(): EvaluationCache {
+	return {
+		keyLo: new Int32Array(EVALUATION_CACHE_SIZE),
+		keyHi: new Int32Array(EVALUATION_CACHE_SIZE),
+		score: new Int32Array(EVALUATION_CACHE_SIZE),
+		filled: new Uint8Array(EVALUATION_CACHE_SIZE),
+	};
+}
+
+/**
+ * Evaluates the position at a ply of the current search path from the incremental
+ * state of the search context, reusing a cached score when the position was seen
+ * before. The caller passes in whether the side to move is in check, which it has
+ * tested already; the other side never is in a legal position, so that settles
+ * the check bonus without testing either king again. The flag is part of the
+ * cache key along with the hash.
+ */
+function evaluatePositionCached(state: GameState, context: SearchContext, ply: number, inCheck: boolean): number {
+	const lo = context.hashLo[ply];
+	const hi = context.hashHi[ply];
+	const slot = lo & (EVALUATION_CACHE_SIZE - 1);
+	const cache = evaluationCache ??= createEvaluationCache();
+	const filled = inCheck ? 2 : 1;
+	if (cache.filled[slot] === filled && cache.keyLo[slot] === lo && cache.keyHi[slot] === hi) {
+		return cache.score[slot];
+	}
+
+	let score = evaluatePieces(state, context.pieceSquareScores[ply], context.pieceBitboards, ply * PIECE_BITBOARD_WORDS);
+	if (inCheck) {
+		score += state.currentPlayer === 'white' ? -CHECK_BONUS : CHECK_BONUS;
+	}
+	cache.keyLo[slot] = lo;
+	cache.keyHi[slot] = hi;
+	cache.score[slot] = score;
+	cache.filled[slot] = filled;
+	return score;
+}
+
+// ============================================================================
+// Negamax Search with Alpha-Beta Pruning
+// ============================================================================
+
+/** Deepest ply the search can reach (quiescence included) */
+const MAX_SEARCH_PLY = 128;
+
+/** Room for the moves of any position (no legal position has more than 218) */
+const MAX_MOVES = 256;
+
+/** Per-search state shared by all nodes of one search */
+interface SearchContext {
+	/** Zobrist hash halves of the position at each ply of the current search path */
+	readonly hashLo: Int32Array;
+	readonly hashHi: Int32Array;
+	/** Up to two quiet moves per ply that recently caused a cutoff */
+	readonly killers: (Move | null)[][];
+	/** Cutoff weight of quiet moves, indexed by (fromSquare * 64 + toSquare) */
+	readonly history: Int32Array;
+	/** Move ordering scores by ply, allocated on first use and reused by every node at that ply */
+	readonly moveScores: Int32Array[];
+	/** White and black king squares at each ply (ply * 2 + colorIndex), -1 if absent */
+	readonly kingSquares: Int8Array;
+	/** Piece-square score (white's point of view) at each ply, updated move by move */
+	readonly pieceSquareScores: Int32Array;
+	/** White and black pieces other than pawns and the king at each ply (ply * 2 + colorIndex) */
+	readonly nonPawnPieces: Int8Array;
+	/** Piece bitboards (see computePieceBitboards) at each ply, PIECE_BITBOARD_WORDS apart */
+	readonly pieceBitboards: Int32Array;
+	/** Piece moved and piece captured by the move made at each ply, for unmakeSearchMove */
+	readonly movedPieces: (Piece | null)[];
+	readonly capturedPieces: (Piece | null)[];
+	/** The transposition table (see getTranspositionTable) */
+	readonly transpositionTable: TranspositionTable;
+}
+
+/**
+ * Creates the state for a new search from the given root position, and starts a
+ * new transposition table generation
+ */
+function createSearchContext(root: GameState): SearchContext {
+	transpositionGeneration = (transpositionGeneration + 1) & 0xff;
+
+	const context: SearchContext = {
+		hashLo: new Int32Array(MAX_SEARCH_PLY + 1),
+		hashHi: new Int32Array(MAX_SEARCH_PLY + 1),
+		killers: [],
+		moveScores: [],
+		history: new Int32Array(64 * 64),
+		kingSquares: new Int8Array((MAX_SEARCH_PLY + 1) * 2),
+		pieceSquareScores: new Int32Array(MAX_SEARCH_PLY + 1),
+		nonPawnPieces: new Int8Array((MAX_SEARCH_PLY + 1) * 2),
+		pieceBitboards: new Int32Array((MAX_SEARCH_PLY + 1) * PIECE_BITBOARD_WORDS),
+		movedPieces: new Array(MAX_SEARCH_PLY + 1).fill(null),
+		capturedPieces: new Array(MAX_SEARCH_PLY + 1).fill(null),
+		transpositionTable: getTranspositionTable(),
+	};
+	[context.hashLo[0], context.hashHi[0]] = computeZobristHalves(root);
+	const bitboards = context.pieceBitboards;
+	computePieceBitboards(root.board, bitboards, 0);
+	context.kingSquares[0] = findKingSquare(bitboards, 0, 'white');
+	context.kingSquares[1] = findKingSquare(bitboards, 0, 'black');
+	context.pieceSquareScores[0] = computePieceSquareScore(bitboards, 0);
+	context.nonPawnPieces[0] = countNonPawnPieces(bitboards, 0, 'white');
+	context.nonPawnPieces[1] = countNonPawnPieces(bitboards, 0, 'black');
+	return context;
+}
+
+/**
+ * Carries the piece-square score and the non-pawn piece counts from ply to ply + 1
+ * by applying only the squares the move touches, so neither leaves nor the null
+ * move test ever have to scan the whole board for them
+ */
+function updateMaterial(context: SearchContext, ply: number, state: GameState, move: Move): void {
+	const piece = state.board[move.from.rank][move.from.file]!;
+	const from = move.from.rank * 8 + move.from.file;
+	const to = move.to.rank * 8 + move.to.file;
+	let score = context.pieceSquareScores[ply]
+		- pieceSquareValue(piece.color, piece.type, from)
+		+ pieceSquareValue(piece.color, move.promotion ?? piece.type, to);
+
+	const counts = context.nonPawnPieces;
+	const moverCount = ply * 2 + (piece.color === 'white' ? 0 : 1);
+	const opponentCount = ply * 2 + (piece.color === 'white' ? 1 : 0);
+	counts[moverCount + 2] = counts[moverCount] + (move.promotion ? 1 : 0);
+	counts[opponentCount + 2] = counts[opponentCount];
+
+	if (move.isEnPassant) {
+		score -= pieceSquareValue(getOpponentColor(piece.color), 'pawn', move.from.rank * 8 + move.to.file);
+	} else {
+		const captured = state.board[move.to.rank][move.to.file];
+		if (captured) {
+			score -= pieceSquareValue(captured.color, captured.type, to);
+			if (captured.type !== 'pawn' && captured.type !== 'king') {
+				counts[opponentCount + 2]--;
+			}
+		}
+	}
+
+	if (move.isCastle) {
+		const rookRank = move.from.rank * 8;
+		const isKingside = move.to.file === 6;
+		score += pieceSquareValue(piece.color, 'rook', rookRank + (isKingside ? 5 : 3))
+			- pieceSquareValue(piece.color, 'rook', rookRank + (isKingside ? 7 : 0));
+	}
+
+	context.pieceSquareScores[ply + 1] = score;
+}
+
+/**
+ * Carries the piece bitboards from ply to ply + 1, moving only the pieces the move touches
+ */
+function updatePieceBitboards(context: SearchContext, ply: number, state: GameState, move: Move): void {
+	const bitboards = context.pieceBitboards;
+	const offset = (ply + 1) * PIECE_BITBOARD_WORDS;
+	bitboards.copyWithin(offset, offset - PIECE_BITBOARD_WORDS, offset);
+
+	const piece = state.board[move.from.rank][move.from.file]!;
+	const colorOffset = piece.color === 'white' ? 0 : 6;
+	const to = move.to.rank * 8 + move.to.file;
+	togglePieceSquare(bitboards, offset, colorOffset + PIECE_TYPE_INDEX[piece.type], move.from.rank * 8 + move.from.file);
+	togglePieceSquare(bitboards, offset, colorOffset + PIECE_TYPE_INDEX[move.promotion ?? piece.type], to);
+
+	if (move.isEnPassant) {
+		togglePieceSquare(bitboards, offset, 6 - colorOffset + PIECE_TYPE_INDEX.pawn, move.from.rank * 8 + move.to.file);
+	} else {
+		const captured = state.board[move.to.rank][move.to.file];
+		if (captured) {
+			togglePieceSquare(bitboards, offset, 6 - colorOffset + PIECE_TYPE_INDEX[captured.type], to);
+		}
+	}
+
+	if (move.isCastle) {
+		const rookRank = move.from.rank * 8;
+		const isKingside = move.to.file === 6;
+		togglePieceSquare(bitboards, offset, colorOffset + PIECE_TYPE_INDEX.rook, rookRank + (isKingside ? 7 : 0));
+		togglePieceSquare(bitboards, offset, colorOffset + PIECE_TYPE_INDEX.rook, rookRank + (isKingside ? 5 : 3));
+	}
+}
+
+/**
+ * Prepares the incrementally updated search state of ply + 1 (hash, king squares,
+ * material and piece bitboards) for a move played at ply
+ */
+function advanceSearchPly(context: SearchContext, ply: number, state: GameState, move: Move, newState: GameState): void {
+	updateZobristHash(context, ply, state, move, newState);
+	updateKingSquares(context, ply, state, move);
+	updateMaterial(context, ply, state, move);
+	updatePieceBitboards(context, ply, state, move);
+}
+
+/**
+ * Makes a move at ply on the board of `state` in place, instead of copying the
+ * board like applyMove, and prepares the search state of ply + 1. The returned
+ * state shares the board, so unmakeSearchMove must take the move back before
+ * the board of `state` is read again. Only used below the root, whose board
+ * belongs to the caller of the search.
+ */
+function makeSearchMove(context: SearchContext, ply: number, state: GameState, move: Move): GameState {
+	const board = state.board;
+	const piece = board[move.from.rank][move.from.file]!;
+	const newState = createChildState(state, move, piece, board);
+	advanceSearchPly(context, ply, state, move, newState);
+
+	context.movedPieces[ply] = piece;
+	context.capturedPieces[ply] = move.isEnPassant ? board[move.from.rank][move.to.file] : board[move.to.rank][move.to.file];
+	placeMove(board, move, piece);
+	return newState;
+}
+
+/**
+ * Takes back a move made at ply by makeSearchMove
+ */
+function unmakeSearchMove(context: SearchContext, ply: number, board: Board, move: Move): void {
+	const { from, to } = move;
+	board[from.rank][from.file] = context.movedPieces[ply];
+	if (move.isEnPassant) {
+		board[to.rank][to.file] = null;
+		board[from.rank][to.file] = context.capturedPieces[ply];
+	} else {
+		board[to.rank][to.file] = context.capturedPieces[ply];
+		if (move.isCastle) {
+			const rookFromFile = to.file === 6 ? 7 : 0;
+			const rookToFile = to.file === 6 ? 5 : 3;
+			board[from.rank][rookFromFile] = board[from.rank][rookToFile];
+			board[from.rank][rookToFile] = null;
+		}
+	}
+}
+
+/**
+ * Carries the king squares from ply to ply + 1, following the king if the move
+ * is a king move, so no node has to scan the board for them
+ */
+function updateKingSquares(context: SearchContext, ply: number, state: GameState, move: Move): void {
+	const kingSquares = context.kingSquares;
+	const from = ply * 2;
+	kingSquares[from + 2] = kingSquares[from];
+	kingSquares[from + 3] = kingSquares[from + 1];
+
+	const piece = state.board[move.from.rank][move.from.file];
+	if (piece && piece.type === 'king') {
+		kingSquares[from + 2 + (piece.color === 'white' ? 0 : 1)] = move.to.rank * 8 + move.to.file;
+	}
+}
+
+/**
+ * Returns the king position of a color at a ply of the current search path
+ */
+function getSearchKing(context: SearchContext, ply: number, color: Color): Position | null {
+	const square = context.kingSquares[ply * 2 + (color === 'white' ? 0 : 1)];
+	return square < 0 ? null : SQUARE_POSITIONS[square];
+}
+
+/**
+ * Passes the turn without moving (a null move), preparing the hash, king
+ * squares, material and piece bitboards for ply + 1 like a real move would
+ */
+function makeNullMove(context: SearchContext, ply: number, state: GameState): GameState {
+	let lo = context.hashLo[ply] ^ ZOBRIST_BLACK_TO_MOVE_LO;
+	let hi = context.hashHi[ply] ^ ZOBRIST_BLACK_TO_MOVE_HI;
+	if (state.enPassantTarget) {
+		lo ^= ZOBRIST_EN_PASSANT_LO[state.enPassantTarget.file];
+		hi ^= ZOBRIST_EN_PASSANT_HI[state.enPassantTarget.file];
+	}
+	context.hashLo[ply + 1] = lo;
+	context.hashHi[ply + 1] = hi;
+
+	const kingSquares = context.kingSquares;
+	kingSquares[ply * 2 + 2] = kingSquares[ply * 2];
+	kingSquares[ply * 2 + 3] = kingSquares[ply * 2 + 1];
+	context.pieceSquareScores[ply + 1] = context.pieceSquareScores[ply];
+	context.nonPawnPieces[ply * 2 + 2] = context.nonPawnPieces[ply * 2];
+	context.nonPawnPieces[ply * 2 + 3] = context.nonPawnPieces[ply * 2 + 1];
+	const bitboards = ply * PIECE_BITBOARD_WORDS;
+	context.pieceBitboards.copyWithin(bitboards + PIECE_BITBOARD_WORDS, bitboards, bitboards + PIECE_BITBOARD_WORDS);
+
+	return { ...state, currentPlayer: getOpponentColor(state.currentPlayer), enPassantTarget: null };
+}
+
+/**
+ * Counts the pieces of a color other than pawns and the king, from the piece bitboards
+ */
+function countNonPawnPieces(bitboards: Int32Array, offset: number, color: Color): number {
+	const pieces = offset + (color === 'white' ? 0 : 6) * 2;
+	let count = 0;
+	for (let typeIndex = PIECE_TYPE_INDEX.knight; typeIndex <= PIECE_TYPE_INDEX.queen; typeIndex++) {
+		count += countSquares(bitboards[pieces + typeIndex * 2], bitboards[pieces + typeIndex * 2 + 1]);
+	}
+	return count;
+}
+
+/**
+ * Checks whether a color has a piece other than pawns and the king at a ply of the
+ * current search path. Without one, zugzwang is likely and passing the turn is no
+ * safe estimate of a real move.
+ */
+function hasNonPawnMaterial(context: SearchContext, ply: number, color: Color): boolean {
+	return context.nonPawnPieces[ply * 2 + (color === 'white' ? 0 : 1)] > 0;
+}
+
+/**
+ * How a stored search score relates to the true minimax value: exact, or only
+ * a lower/upper bound because the search that produced it was cut off
+ */
+const TT_EXACT = 0;
+const TT_LOWER_BOUND = 1;
+const TT_UPPER_BOUND = 2;
+
+/** Encoded move meaning "no move" (no real move starts and ends on a1) */
+const NO_MOVE = 0;
+
+/** Bit layout of a transposition entry's data word (see TranspositionTable) */
+const TT_MOVE_MASK = 0x7fff;
+const TT_FLAG_SHIFT = 16;
+const TT_DEPTH_SHIFT = 18;
+
+/**
+ * Fixed-size transposition table in parallel typed arrays, one slot per low
+ * hash bits. Memory use is constant, and there is no per-entry allocation.
+ * Scores are from the point of view of the side to move, which is part of the key.
+ *
+ * The table belongs to the thread that searches with it and is kept between
+ * searches (see transpositionGeneration), so a search result depends on the
+ * searches made before it: asking about the same position again, or after
+ * searching other positions, can return a different move when root moves score
+ * close together. A fixed sequence of searches always gives the same results.
+ */
+interface TranspositionTable {
+	/** Full Zobrist hash halves of the stored position, to detect slot collisions */
+	readonly keyLo: Int32Array;
+	readonly keyHi: Int32Array;
+	/**
+	 * Best (or refuting) move encoded by encodeMove in bits 0-14, tried first on a
+	 * revisit, the TT_* bound flag at TT_FLAG_SHIFT and the search depth at
+	 * TT_DEPTH_SHIFT. Stored depths are at least 1, so 0 marks an empty slot.
+	 */
+	readonly data: Int32Array;
+	readonly score: Int32Array;
+	/** Search generation (see transpositionGeneration) that stored the result */
+	readonly generation: Uint8Array;
+}
+
+/**
+ * Allocates an empty transposition table with the given (power of two) number of slots
+ */
+function createTranspositionTable(size: number): TranspositionTable {
+	return {
+		keyLo: new Int32Array(size),
+		keyHi: new Int32Array(size),
+		data: new Int32Array(size),
+		score: new Int32Array(size),
+		generation: new Uint8Array(size),
+	};
+}
+
+/** The table kept between searches, allocated on first use (see getTranspositionTable) */
+let transpositionTable: TranspositionTable | undefined;
+
+/**
+ * Returns the transposition table. The table takes about 17MB, so it is allocated
+ * by the first search rather than on import.
+ */
+function getTranspositionTable(): TranspositionTable {
+	return transpositionTable ??= createTranspositionTable(TRANSPOSITION_TABLE_SIZE);
+}
+
+/**
+ * Counter bumped by every new search. The table is kept between searches, since
+ * the next move's search revisits many of the same positions, but results from
+ * earlier searches no longer hold on to their slots by depth alone.
+ */
+let transpositionGeneration = 0;
+
+/**
+ * Encodes a move as a small integer: from and to squares plus the promotion piece
+ */
+function encodeMove(move: Move): number {
+	const from = move.from.rank * 8 + move.from.file;
+	const to = move.to.rank * 8 + move.to.file;
+	return (from * 64 + to) * 8 + (move.promotion ? PIECE_TYPE_INDEX[move.promotion] + 1 : 0);
+}
+
+/**
+ * Rebuilds a move encoded by encodeMove in the given position, or returns null
+ * if it cannot be a move of the side to move there (a hash collision)
+ */
+function decodeMove(state: GameState, code: number): Move | null {
+	const from = code >> 9;
+	const to = (code >> 3) & 63;
+	const promotionIndex = (code & 7) - 1;
+
+	const piece = state.board[from >> 3][from & 7];
+	const target = state.board[to >> 3][to & 7];
+	if (!piece || piece.color !== state.currentPlayer || (target && target.color === piece.color)) {
+		return null;
+	}
 
-			// Center control bonus (aggressive players love the center!)
-			const isCenterSquare = (rank === 3 || rank === 4) && (file === 3 || file === 4);
-			const isExtendedCenter = rank >= 2 && rank <= 5 && file >= 2 && file <= 5;
+	const fromPos = SQUARE_POSITIONS[from];
+	const toPos = SQUARE_POSITIONS[to];
+	const isEnPassant = piece.type === 'pawn' && fromPos.file !== toPos.file && !target;
+	const isCastle = piece.type === 'king' && Math.abs(toPos.file - fromPos.file) === 2;
+	const promotion = promotionIndex >= 0 ? PIECE_TYPES_BY_INDEX[promotionIndex] : undefined;
+	return createMove(fromPos, toPos, target !== null || isEnPassant, promotion, isEnPassant, isCastle);
+}
 
-			if (isCenterSquare) {
-				score += sign * CENTER_CONTROL_BONUS;
-			} else if (isExtendedCenter) {
-				score += sign * EXTENDED_CENTER_BONUS;
-			}
+/**
+ * Rebuilds the best move of a transposition entry in the position being searched,
+ * or returns null unless it is a legal move there. The entry's key matched, but
+ * a key collision would hand over another position's move, which must never be
+ * played, so the move is looked up among the legal moves of its piece.
+ */
+function decodeHashMove(state: GameState, code: number, kingPos: Position | null, inCheck: boolean): Move | null {
+	const from = code >> 9;
+	const piece = state.board[from >> 3][from & 7];
+	if (!piece || piece.color !== state.currentPlayer) {
+		return null;
+	}
 
-			// Piece advancement bonus (push forward aggressively!)
-			const advancementRank = piece.color === 'white' ? rank : 7 - rank;
-			if (piece.type !== 'king') {
-				score += sign * (advancementRank * ADVANCEMENT_BONUS_PER_RANK);
-			}
+	const moves: Move[] = [];
+	addPieceMoves(state, SQUARE_POSITIONS[from], piece, moves);
+	const legalMoves = kingPos ? filterLegalMoves(state, moves, kingPos, inCheck) : moves;
+	return legalMoves.find(move => encodeMove(move) === code) ?? null;
+}
 
-			// Piece mobility (more squares attacked = more aggressive)
-			if (piece.color === state.currentPlayer) {
-				const mobility = countAttackedSquares(state, pos);
-				score += sign * (mobility * 5); // 5 points per available move
-			}
+/**
+ * Converts a mate score from distance to the root (as the search uses it) to
+ * distance to the node at `ply` (as the table stores it), so an entry stays
+ * right when the position recurs at another ply. Other scores pass unchanged.
+ */
+function scoreToTransposition(score: number, ply: number): number {
+	return score >= MATE_THRESHOLD ? score + ply : score <= -MATE_THRESHOLD ? score - ply : score;
+}
 
-			// Passed pawn bonus
-			if (piece.type === 'pawn' && isPassedPawn(board, pos, piece.color)) {
-				score += sign * (PASSED_PAWN_BONUS + advancementRank * 10);
-			}
+/**
+ * Inverse of {@link scoreToTransposition}: converts a stored score back to
+ * distance to the root for a node at `ply`
+ */
+function scoreFromTransposition(score: number, ply: number): number {
+	return score >= MATE_THRESHOLD ? score - ply : score <= -MATE_THRESHOLD ? score + ply : score;
+}
+
+/**
+ * Checks whether a slot holds an entry for the position with the given hash
+ */
+function matchesTransposition(table: TranspositionTable, slot: number, lo: number, hi: number): boolean {
+	return table.data[slot] !== 0 && table.keyLo[slot] === lo && table.keyHi[slot] === hi;
+}
+
+/**
+ * Records the result of searching a position at `ply`. `alpha` and `beta` are the
+ * window the node was entered with; a score outside it is only a bound. A slot keeps
+ * the deeper of its current and the new result (depth-preferred replacement),
+ * unless its current result is left over from an earlier search.
+ */
+function storeTransposition(table: TranspositionTable, lo: number, hi: number, depth: number, ply: number, score: number, alpha: number, beta: number, bestMove: Move | null): void {
+	const slot = lo & (TRANSPOSITION_TABLE_SIZE - 1);
+	if (depth < table.data[slot] >>> TT_DEPTH_SHIFT && table.generation[slot] === transpositionGeneration) {
+		return;
+	}
+
+	const flag = score <= alpha ? TT_UPPER_BOUND : score >= beta ? TT_LOWER_BOUND : TT_EXACT;
+	const data = (depth << TT_DEPTH_SHIFT) | (flag << TT_FLAG_SHIFT) | (bestMove ? encodeMove(bestMove) : NO_MOVE);
+	table.keyLo[slot] = lo;
+	table.keyHi[slot] = hi;
+	table.data[slot] = data;
+	table.score[slot] = scoreToTransposition(score, ply);
+	table.generation[slot] = transpositionGeneration;
+}
 
-			// Rook on open file bonus
-			if (piece.type === 'rook' && isOpenFile(board, file)) {
-				score += sign * OPEN_FILE_BONUS;
+/**
+ * Derives the Zobrist hash for ply + 1 from the hash at ply by XOR-ing out what
+ * the move changed, instead of rehashing all 64 squares of the child
+ */
+function updateZobristHash(context: SearchContext, ply: number, state: GameState, move: Move, newState: GameState): void {
+	let lo = context.hashLo[ply];
+	let hi = context.hashHi[ply];
+
+	const from = move.from.rank * 8 + move.from.file;
+	const to = move.to.rank * 8 + move.to.file;
+	const piece = state.board[move.from.rank][move.from.file]!;
+	const color = piece.color === 'white' ? 0 : 6;
+
+	// Moving (or promoting) piece
+	let index = zobristPieceIndex(piece, from);
+	lo ^= ZOBRIST_PIECE_LO[index];
+	hi ^= ZOBRIST_PIECE_HI[index];
+	index = (color + PIECE_TYPE_INDEX[move.promotion ?? piece.type]) * 64 + to;
+	lo ^= ZOBRIST_PIECE_LO[index];
+	hi ^= ZOBRIST_PIECE_HI[index];
+
+	// Captured piece
+	if (move.isEnPassant) {
+		index = (6 - color + PIECE_TYPE_INDEX.pawn) * 64 + move.from.rank * 8 + move.to.file;
+		lo ^= ZOBRIST_PIECE_LO[index];
+		hi ^= ZOBRIST_PIECE_HI[index];
+	} else {
+		const captured = state.board[move.to.rank][move.to.file];
+		if (captured) {
+			index = zobristPieceIndex(captured, to);
+			lo ^= ZOBRIST_PIECE_LO[index];
+			hi ^= ZOBRIST_PIECE_HI[index];
+		}
+	}
+
+	// Castling rook
+	if (move.isCastle) {
+		const isKingside = move.to.file === 6;
+		const rookBase = (color + PIECE_TYPE_INDEX.rook) * 64 + move.from.rank * 8;
+		lo ^= ZOBRIST_PIECE_LO[rookBase + (isKingside ? 7 : 0)] ^ ZOBRIST_PIECE_LO[rookBase + (isKingside ? 5 : 3)];
+		hi ^= ZOBRIST_PIECE_HI[rookBase + (isKingside ? 7 : 0)] ^ ZOBRIST_PIECE_HI[rookBase + (isKingside ? 5 : 3)];
+	}
+
+	// Castling rights and en passant target, diffed against the child state
+	const castlingChange = castlingRightsMask(state.castlingRights) ^ castlingRightsMask(newState.castlingRights);
+	if (castlingChange) {
+		for (let i = 0; i < 4; i++) {
+			if (castlingChange & (1 << i)) {
+				lo ^= ZOBRIST_CASTLING_LO[i];
+				hi ^= ZOBRIST_CASTLING_HI[i];
 			}
 		}
 	}
+	if (state.enPassantTarget) {
+		lo ^= ZOBRIST_EN_PASSANT_LO[state.enPassantTarget.file];
+		hi ^= ZOBRIST_EN_PASSANT_HI[state.enPassantTarget.file];
+	}
+	if (newState.enPassantTarget) {
+		lo ^= ZOBRIST_EN_PASSANT_LO[newState.enPassantTarget.file];
+		hi ^= ZOBRIST_EN_PASSANT_HI[newState.enPassantTarget.file];
+	}
 
-	// Bishop pair bonus
-	if (whiteBishops >= 2) {
-		score += BISHOP_PAIR_BONUS;
+	context.hashLo[ply + 1] = lo ^ ZOBRIST_BLACK_TO_MOVE_LO;
+	context.hashHi[ply + 1] = hi ^ ZOBRIST_BLACK_TO_MOVE_HI;
+}
+
+/**
+ * Checks whether two moves are the same move
+ */
+function isSameMove(a: Move | null, b: Move): boolean {
+	return a !== null &&
+		a.from.rank === b.from.rank && a.from.file === b.from.file &&
+		a.to.rank === b.to.rank && a.to.file === b.to.file &&
+		a.promotion === b.promotion;
+}
+
+/**
+ * Records a quiet move that caused a beta cutoff as a killer for its ply and
+ * credits it in the history table
+ */
+function recordCutoff(context: SearchContext, move: Move, depth: number, ply: number): void {
+	if (move.isCapture) {
+		return;
 	}
-	if (blackBishops >= 2) {
-		score -= BISHOP_PAIR_BONUS;
+
+	const killers = context.killers[ply] ??= [null, null];
+	if (!isSameMove(killers[0], move)) {
+		killers[1] = killers[0];
+		killers[0] = move;
 	}
 
-	// Doubled pawn penalty
-	score += countDoubledPawns(board, 'white') * DOUBLED_PAWN_PENALTY;
-	score -= countDoubledPawns(board, 'black') * DOUBLED_PAWN_PENALTY;
+	context.history[(move.from.rank * 8 + move.from.file) * 64 + move.to.rank * 8 + move.to.file] += depth * depth;
+}
 
-	// Check bonus (aggressive player loves giving checks!)
-	if (isKingInCheck(board, 'black')) {
-		score += CHECK_BONUS;
+/**
+ * Scores moves for alpha-beta ordering in stages: captures (most valuable victim,
+ * least valuable attacker), then killer moves, then quiet moves by history with
+ * a bonus for landing close to the enemy king (aggressive moves are the
+ * likeliest to cause cutoffs). Returns the ply's score buffer, parallel to
+ * `moves`; the moves are not sorted here but picked best-first with
+ * selectNextMove, since most cutoffs come within the first few moves. (The hash
+ * move is not ordered here: negamax searches it before generating the others.)
+ */
+function scoreMoves(state: GameState, moves: Move[], context: SearchContext, ply: number): Int32Array {
+	// The enemy king zone is looked up once per node; testing a move is then a single AND
+	const enemyKing = getSearchKing(context, ply, getOpponentColor(state.currentPlayer));
+	const enemyKingSquare = enemyKing ? enemyKing.rank * 8 + enemyKing.file : 0;
+	const zoneLo = enemyKing ? KING_ZONE_LO[enemyKingSquare] : 0;
+	const zoneHi = enemyKing ? KING_ZONE_HI[enemyKingSquare] : 0;
+	const killers = context.killers[ply];
+
+	const scores = context.moveScores[ply] ??= new Int32Array(MAX_MOVES);
+	for (let i = 0; i < moves.length; i++) {
+		scores[i] = scoreMoveForOrdering(state, moves[i], context, killers, enemyKingSquare, zoneLo, zoneHi);
 	}
-	if (isKingInCheck(board, 'white')) {
-		score -= CHECK_BONUS;
+	return scores;
+}
+
+/**
+ * Moves the best-scored move of `moves[index..]` to `index`, shifting the moves
+ * it passes (and their scores) one place up, and returns it. Picking moves this
+ * way yields the same order as a stable sort, but only as far as the search gets.
+ */
+function selectNextMove(moves: Move[], scores: Int32Array, index: number): Move {
+	let best = index;
+	for (let i = index + 1; i < moves.length; i++) {
+		if (scores[i] > scores[best]) {
+			best = i;
+		}
+	}
+
+	const move = moves[best];
+	const score = scores[best];
+	for (let i = best; i > index; i--) {
+		moves[i] = moves[i - 1];
+		scores[i] = scores[i - 1];
+	}
+	moves[index] = move;
+	scores[index] = score;
+	return move;
+}
+
+/**
+ * Sorts moves in place by descending score (`scores[i]` belongs to `moves[i]`
+ * and is moved along with it). Insertion sort: stable, and move lists are short.
+ */
+function sortMovesByScore(moves: Move[], scores: Int32Array): void {
+	for (let i = 1; i < moves.length; i++) {
+		const move = moves[i];
+		const score = scores[i];
+		let j = i - 1;
+		while (j >= 0 && scores[j] < score) {
+			moves[j + 1] = moves[j];
+			scores[j + 1] = scores[j];
+			j--;
+		}
+		moves[j + 1] = move;
+		scores[j + 1] = score;
+	}
+}
+
+/**
+ * Capture ordering scores, most valuable victim first and least valuable attacker
+ * among equal victims, indexed by (victimIndex * 6 + attackerIndex) with
+ * PIECE_TYPE_INDEX. En passant captures look up the pawn as victim.
+ */
+const MVV_LVA_SCORES = Int32Array.from({ length: 36 }, (_, index) =>
+	PIECE_VALUES[PIECE_TYPES_BY_INDEX[Math.floor(index / 6)]] * 10 - PIECE_VALUES[PIECE_TYPES_BY_INDEX[index % 6]]
+);
+
+/** Ordering score of a single move (see scoreMoves) */
+function scoreMoveForOrdering(
+	state: GameState,
+	move: Move,
+	context: SearchContext,
+	killers: (Move | null)[] | undefined,
+	enemyKingSquare: number,
+	zoneLo: number,
+	zoneHi: number
+): number {
+	const victim = getCapturedPieceType(state.board, move);
+	if (victim) {
+		const attacker = state.board[move.from.rank][move.from.file]!;
+		return CAPTURE_ORDER_BONUS + MVV_LVA_SCORES[PIECE_TYPE_INDEX[victim] * 6 + PIECE_TYPE_INDEX[attacker.type]];
 	}
 
-	// Attack bonus - count attacks on opponent pieces
-	const attackBonus = calculateAttackBonus(state);
-	score += attackBonus;
+	if (killers) {
+		for (let slot = 0; slot < killers.length; slot++) {
+			if (isSameMove(killers[slot], move)) {
+				return KILLER_ORDER_BONUS[slot];
+			}
+		}
+	}
 
+	const toSquare = move.to.rank * 8 + move.to.file;
+	let score = Math.min(context.history[(move.from.rank * 8 + move.from.file) * 64 + toSquare], HISTORY_ORDER_LIMIT);
+	if (hasSquare(zoneLo, zoneHi, toSquare)) {
+		score += KING_PROXIMITY_ORDER_BONUS - MANHATTAN_DISTANCE[enemyKingSquare * 64 + toSquare] * KING_PROXIMITY_ORDER_STEP;
+	}
 	return score;
 }
 
 /**
- * Calculates bonus for attacking opponent's pieces
+ * Generates the legal moves at a ply of the search, in the same order as
+ * generateLegalMoves, or only the captures among them. The mover's pieces are
+ * found on the ply's piece bitboards instead of by scanning the board, and the
+ * caller passes in the check test it has made already. Captures are picked out
+ * before the legality test, so quiet moves are never tested for it.
  */
-function calculateAttackBonus(state: GameState): number {
-	let bonus = 0;
+function generateSearchMoves(
+	state: GameState,
+	context: SearchContext,
+	ply: number,
+	kingPos: Position | null,
+	inCheck: boolean,
+	capturesOnly: boolean
+): Move[] {
+	const moves: Move[] = [];
+	const bitboards = context.pieceBitboards;
+	const pieces = ply * PIECE_BITBOARD_WORDS + (state.currentPlayer === 'white' ? 0 : 6) * 2;
+	let ownLo = 0;
+	let ownHi = 0;
+	for (let typeIndex = 0; typeIndex < 6; typeIndex++) {
+		ownLo |= bitboards[pieces + typeIndex * 2];
+		ownHi |= bitboards[pieces + typeIndex * 2 + 1];
+	}
 
-	for (let rank = 0; rank < 8; rank++) {
-		for (let file = 0; file < 8; file++) {
-			const piece = state.board[rank][file];
+	// Ascending squares, like the rank by rank, file by file board scan. A square the
+	// board disagrees on means the search state is corrupt, so it is not skipped.
+	for (let half = 0; half < 2; half++) {
+		for (let bits = half === 0 ? ownLo : ownHi; bits !== 0; bits &= bits - 1) {
+			const square = half * 32 + lowestBit(bits);
+			const piece = state.board[square >> 3][square & 7];
 			if (!piece || piece.color !== state.currentPlayer) {
-				continue;
+				throw new Error(`Piece bitboards disagree with the board on ${positionToAlgebraic(SQUARE_POSITIONS[square])}`);
 			}
+			addPieceMoves(state, SQUARE_POSITIONS[square], piece, moves);
+		}
+	}
 
-			const moves = generatePieceMoves(state, { rank, file });
-			for (const move of moves) {
-				if (move.isCapture) {
-					const targetPiece = getPieceAt(state.board, move.to);
-					if (targetPiece) {
-						// Bonus proportional to the value of the piece being attacked
-						bonus += (PIECE_VALUES[targetPiece.type] / 10) * CAPTURE_AGGRESSION_BONUS;
-					}
-				}
+	if (capturesOnly) {
+		let captureCount = 0;
+		for (const move of moves) {
+			if (move.isCapture) {
+				moves[captureCount++] = move;
 			}
 		}
+		moves.length = captureCount;
 	}
 
-	return state.currentPlayer === 'white' ? bonus : -bonus;
+	return kingPos ? filterLegalMoves(state, moves, kingPos, inCheck) : moves;
 }
 
-// ============================================================================
-// Minimax Search with Alpha-Beta Pruning
-// ============================================================================
+/**
+ * Quiescence search: at the horizon, keeps playing captures until the position is
+ * quiet so leaves are never evaluated in the middle of an exchange. The side to
+ * move may also "stand pat" on the static evaluation instead of capturing, unless
+ * it is in check: then every evasion is searched, and having none is mate. Past
+ * QUIESCENCE_EVASION_PLIES plies from the horizon (`quiescencePly`), a position in
+ * check just gets its static evaluation.
+ */
+function quiesce(state: GameState, alpha: number, beta: number, context: SearchContext, ply: number, quiescencePly: number): number {
+	const kingPos = getSearchKing(context, ply, state.currentPlayer);
+	const inCheck = kingPos !== null && isSquareAttackedByPieces(
+		state.board,
+		context.pieceBitboards,
+		ply * PIECE_BITBOARD_WORDS,
+		kingPos.rank * 8 + kingPos.file,
+		getOpponentColor(state.currentPlayer)
+	);
+	if (inCheck && ply < MAX_SEARCH_PLY && quiescencePly < QUIESCENCE_EVASION_PLIES) {
+		return quiesceEvasions(state, alpha, beta, context, ply, quiescencePly, kingPos);
+	}
+
+	// Lazy evaluation: when the piece-square score alone is so far above beta that
+	// the remaining terms cannot bring it back, the node fails high without them.
+	// The margin is a heuristic, so the node claims only beta, not a score above it.
+	const sign = state.currentPlayer === 'white' ? 1 : -1;
+	const lazyScore = sign * context.pieceSquareScores[ply];
+	if (lazyScore - LAZY_EVALUATION_MARGIN >= beta) {
+		return beta;
+	}
+
+	const standPat = sign * evaluatePositionCached(state, context, ply, inCheck);
+	if (standPat >= beta || inCheck || ply >= MAX_SEARCH_PLY) {
+		return standPat;
+	}
+	alpha = Math.max(alpha, standPat);
+
+	const captures = generateSearchMoves(state, context, ply, kingPos, false, true);
+	const scores = scoreMoves(state, captures, context, ply);
+
+	let bestScore = standPat;
+	for (let i = 0; i < captures.length; i++) {
+		const move = selectNextMove(captures, scores, i);
+		const score = -quiesce(makeSearchMove(context, ply, state, move), -beta, -alpha, context, ply + 1, quiescencePly + 1);
+		unmakeSearchMove(context, ply, state.board, move);
+		if (score > bestScore) {
+			bestScore = score;
+		}
+		alpha = Math.max(alpha, score);
+		if (alpha >= beta) {
+			break;
+		}
+	}
+
+	return bestScore;
+}
+
+/**
+ * Quiescence search of a position whose side to move is in check (see quiesce)
+ */
+function quiesceEvasions(state: GameState, alpha: number, beta: number, context: SearchContext, ply: number, quiescencePly: number, kingPos: Position): number {
+	const evasions = generateSearchMoves(state, context, ply, kingPos, true, false);
+	if (evasions.length === 0) {
+		return -MATE_SCORE + ply;
+	}
+	const scores = scoreMoves(state, evasions, context, ply);
+
+	let bestScore = -INFINITY_SCORE;
+	for (let i = 0; i < evasions.length; i++) {
+		const move = selectNextMove(evasions, scores, i);
+		const score = -quiesce(makeSearchMove(context, ply, state, move), -beta, -alpha, context, ply + 1, quiescencePly + 1);
+		unmakeSearchMove(context, ply, state.board, move);
+		if (score > bestScore) {
+			bestScore = score;
+		}
+		alpha = Math.max(alpha, score);
+		if (alpha >= beta) {
+			break;
+		}
+	}
+
+	return bestScore;
+}
+
+/**
+ * Plays a move and searches the resulting position for negamax at `depth`,
+ * returning the score from the mover's point of view. The first move of a node is
+ * searched with the full window, later ones with a null window first (PVS).
+ */
+function searchChild(
+	state: GameState,
+	move: Move,
+	depth: number,
+	alpha: number,
+	beta: number,
+	isFirstMove: boolean,
+	context: SearchContext,
+	ply: number
+): number {
+	const newState = makeSearchMove(context, ply, state, move);
+	const childDepth = depth - 1;
+
+	let evaluation: number;
+	if (isFirstMove) {
+		evaluation = -negamax(newState, childDepth, -beta, -alpha, context, ply + 1);
+	} else {
+		// Null window: only prove that the move does not beat alpha
+		evaluation = -negamax(newState, childDepth, -alpha - 1, -alpha, context, ply + 1);
+		if (evaluation > alpha && evaluation < beta) {
+			evaluation = -negamax(newState, childDepth, -beta, -evaluation, context, ply + 1);
+		}
+	}
+
+	unmakeSearchMove(context, ply, state.board, move);
+	return evaluation;
+}
 
 /**
- * Minimax search with alpha-beta pruning
- * Aggressive player searches deeper on captures
+ * Negamax search with alpha-beta pruning, using Principal Variation Search:
+ * the first move is searched with the full window and later moves with a
+ * null window, re-searching only when a later move turns out to be better.
+ * Scores are from the point of view of the side to move.
+ * Aggressive player searches captures to the end at the leaves (see quiesce)
  */
-function minimax(
+function negamax(
 	state: GameState,
 	depth: number,
 	alpha: number,
 	beta: number,
-	maximizingPlayer: boolean
+	context: SearchContext,
+	ply: number
 ): number {
-	// Terminal conditions
+	// Terminal conditions: resolve pending captures before evaluating
 	if (depth === 0) {
-		return evaluatePosition(state);
+		return quiesce(state, alpha, beta, context, ply, 0);
 	}
 
-	const moves = generateAllMoves(state);
+	// Reuse an earlier search of this position when its score settles this window
+	const hashLo = context.hashLo[ply];
+	const hashHi = context.hashHi[ply];
+	const slot = hashLo & (TRANSPOSITION_TABLE_SIZE - 1);
+	const table = context.transpositionTable;
+	let hashMove = NO_MOVE;
+	if (matchesTransposition(table, slot, hashLo, hashHi)) {
+		const data = table.data[slot];
+		const storedScore = scoreFromTransposition(table.score[slot], ply);
+		hashMove = data & TT_MOVE_MASK;
+		if (data >>> TT_DEPTH_SHIFT >= depth) {
+			const flag = (data >>> TT_FLAG_SHIFT) & 3;
+			if (flag === TT_EXACT ||
+				(flag === TT_LOWER_BOUND && storedScore >= beta) ||
+				(flag === TT_UPPER_BOUND && storedScore <= alpha)) {
+				return storedScore;
+			}
+		}
+	}
+	const alphaOrig = alpha;
+
+	const kingPos = getSearchKing(context, ply, state.currentPlayer);
+	const inCheck = kingPos !== null && isSquareAttacked(state.board, kingPos, getOpponentColor(state.currentPlayer));
+
+	// Null-move pruning: if the opponent cannot reach beta even when given a free
+	// move, a real move would fail high too. Passing is illegal in check.
+	if (depth >= NULL_MOVE_MIN_DEPTH && !inCheck && hasNonPawnMaterial(context, ply, state.currentPlayer)) {
+		const nullState = makeNullMove(context, ply, state);
+		const nullScore = -negamax(nullState, depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + 1, context, ply + 1);
+		if (nullScore >= beta) {
+			return beta;
+		}
+	}
+
+	let bestScore = -INFINITY_SCORE;
+	let bestMove: Move | null = null;
+
+	// Staged move generation: the hash move is searched before any other move is
+	// generated, and when it cuts off, move generation is skipped altogether
+	const firstMove = hashMove !== NO_MOVE ? decodeHashMove(state, hashMove, kingPos, inCheck) : null;
+	if (firstMove) {
+		bestScore = searchChild(state, firstMove, depth, alpha, beta, true, context, ply);
+		bestMove = firstMove;
+		alpha = Math.max(alpha, bestScore);
+		if (alpha >= beta) {
+			recordCutoff(context, firstMove, depth, ply);
+			storeTransposition(table, hashLo, hashHi, depth, ply, bestScore, alphaOrig, beta, bestMove);
+			return bestScore;
+		}
+	}
+
+	const moves = generateSearchMoves(state, context, ply, kingPos, inCheck, false);
 
 	// Checkmate or stalemate
 	if (moves.length === 0) {
-		if (isKingInCheck(state.board, state.currentPlayer)) {
-			// Checkmate - worst possible score
-			return maximizingPlayer ? -Infinity : Infinity;
+		if (inCheck) {
+			// Checkmate - worst possible score, less bad the later it comes
+			return -MATE_SCORE + ply;
 		}
 		// Stalemate
 		return 0;
 	}
 
-	// Sort moves to search captures first (for better alpha-beta pruning)
-	const sortedMoves = moves.sort((a, b) => {
-		// Captures first, then checks
-		const aCapture = a.isCapture ? 1 : 0;
-		const bCapture = b.isCapture ? 1 : 0;
-		return bCapture - aCapture;
-	});
-
-	if (maximizingPlayer) {
-		let maxEval = -Infinity;
-		for (const move of sortedMoves) {
-			const newState = applyMove(state, move);
-			// Quiescence search: extend depth for captures
-			const extension = move.isCapture ? 1 : 0;
-			const evaluation = minimax(newState, depth - 1 + Math.min(extension, depth > 1 ? 1 : 0), alpha, beta, false);
-			maxEval = Math.max(maxEval, evaluation);
-			alpha = Math.max(alpha, evaluation);
-			if (beta <= alpha) {
-				break; // Beta cutoff
-			}
+	// Score moves so the most forcing ones are searched first (for better alpha-beta pruning)
+	const scores = scoreMoves(state, moves, context, ply);
+
+	for (let i = 0; i < moves.length; i++) {
+		const move = selectNextMove(moves, scores, i);
+		if (firstMove && encodeMove(move) === hashMove) {
+			continue;
 		}
-		return maxEval;
-	} else {
-		let minEval = Infinity;
-		for (const move of sortedMoves) {
-			const newState = applyMove(state, move);
-			const extension = move.isCapture ? 1 : 0;
-			const evaluation = minimax(newState, depth - 1 + Math.min(extension, depth > 1 ? 1 : 0), alpha, beta, true);
-			minEval = Math.min(minEval, evaluation);
-			beta = Math.min(beta, evaluation);
-			if (beta <= alpha) {
-				break; // Alpha cutoff
+		const evaluation = searchChild(state, move, depth, alpha, beta, bestMove === null, context, ply);
+		if (evaluation > bestScore) {
+			bestScore = evaluation;
+			bestMove = move;
+		}
+		alpha = Math.max(alpha, evaluation);
+		if (alpha >= beta) {
+			recordCutoff(context, move, depth, ply);
+			break; // Beta cutoff
+		}
+	}
+	storeTransposition(table, hashLo, hashHi, depth, ply, bestScore, alphaOrig, beta, bestMove);
+	return bestScore;
+}
+
+// ============================================================================
+// Opening Book
+// ============================================================================
+
+/**
+ * Opening lines in the aggressive style, as moves in coordinate notation from the
+ * initial position. Every position along a line is answered with the line's next
+ * move; where lines share a position, the first line listed decides.
+ */
+const OPENING_LINES: readonly string[] = [
+	'e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3',
+	'e2e4 c7c5 g1f3 b8c6 d2d4 c5d4 f3d4',
+	'e2e4 c7c5 g1f3 e7e6 d2d4 c5d4 f3d4',
+	'e2e4 e7e5 f2f4 e5f4 g1f3',
+	'e2e4 e7e6 d2d4 d7d5 b1c3',
+	'e2e4 c7c6 d2d4 d7d5 e4e5',
+	'e2e4 d7d5 e4d5 d8d5 b1c3',
+	'd2d4 g8f6 c2c4 e7e6',
+	'c2c4 e7e5',
+	'g1f3 d7d5',
+];
+
+/** Book moves (encoded by encodeMove) by Zobrist key, built on first use */
+let openingBook: Map<number, number> | undefined;
+
+/**
+ * Plays through the opening lines and records the move each position is answered with
+ */
+function buildOpeningBook(): Map<number, number> {
+	const book = new Map<number, number>();
+	for (const line of OPENING_LINES) {
+		let state = createInitialGameState();
+		for (const notation of line.split(' ')) {
+			const move = generateAllMoves(state).find(candidate => moveToAlgebraic(candidate) === notation);
+			if (!move) {
+				throw new Error(`Illegal opening book move ${notation} in line ${line}`);
 			}
+			const key = computeZobristHash(state);
+			if (!book.has(key)) {
+				book.set(key, encodeMove(move));
+			}
+			state = applyMove(state, move);
 		}
-		return minEval;
 	}
+	return book;
+}
+
+/**
+ * Returns the book move of a position, or null if the position is not in the book.
+ * The search never consults the book, so a caller that wants book moves asks for
+ * one before searching (see playAggressiveGame).
+ */
+export function findBookMove(state: GameState): Move | null {
+	const code = (openingBook ??= buildOpeningBook()).get(computeZobristHash(state));
+	return code === undefined ? null : decodeMove(state, code);
 }
 
 // ============================================================================
 // Main Chess Player Interface
 // ============================================================================
 
+/**
+ * Scores a root move from the moving side's perspective: the search value plus
+ * the aggressive capture/check bonus. A forced mate gets no bonus, so a quicker
+ * mate always outscores a slower one. A move that cannot beat `bestScore` gets
+ * some score no greater than `bestScore`, which is all the root needs to know.
+ */
+function scoreRootMove(state: GameState, move: Move, searchDepth: number, bestScore: number, context: SearchContext): number {
+	const newState = applyMove(state, move);
+	advanceSearchPly(context, 0, state, move, newState);
+
+	// Add capture bonus to move ordering (aggressive preference)
+	const capturedType = getCapturedPieceType(state.board, move);
+	let moveBonus = capturedType ? CAPTURE_BONUS_VALUES[capturedType] : 0;
+
+	// Check if move gives check (aggressive!)
+	const enemyKing = getSearchKing(context, 1, getOpponentColor(state.currentPlayer));
+	if (enemyKing && isSquareAttacked(newState.board, enemyKing, state.currentPlayer)) {
+		moveBonus += CHECK_BONUS;
+	}
+
+	const score = -negamax(newState, searchDepth - 1, -INFINITY_SCORE, moveBonus - bestScore, context, 1);
+	return Math.abs(score) >= MATE_THRESHOLD ? score : score + moveBonus;
+}
+
+/**
+ * Iterative deepening at the root: searches all root moves at depths 1 through
+ * `searchDepth`, reordering `moves` after each iteration by the scores it found,
+ * so the best move is searched first, and sets the bound for the other moves, at
+ * the next depth. The scores of the other moves are only upper bounds, but they
+ * still rank the near misses ahead of the clearly bad moves. The shallow
+ * iterations are cheap and also warm up the transposition table and the
+ * killer/history tables.
+ *
+ * Returns the score of the best move of the last iteration. Stops early once an
+ * iteration finds a forced mate (a score of at least MATE_THRESHOLD): mate scores
+ * fall by one per ply, so the iteration already chose the quickest mate it saw,
+ * and a deeper one would only add mates too long to have been seen.
+ */
+function deepenRootMoves(state: GameState, moves: Move[], searchDepth: number, context: SearchContext): number {
+	const scores = new Int32Array(moves.length);
+	let bestScore = -INFINITY_SCORE;
+	for (let depth = 1; depth <= searchDepth; depth++) {
+		bestScore = -INFINITY_SCORE;
+		for (let i = 0; i < moves.length; i++) {
+			scores[i] = scoreRootMove(state, moves[i], depth, bestScore, context);
+			bestScore = Math.max(bestScore, scores[i]);
+		}
+
+		// The sort is stable, so the best move (the first with the top score) leads
+		sortMovesByScore(moves, scores);
+		if (bestScore >= MATE_THRESHOLD) {
+			break;
+		}
+	}
+	return bestScore;
+}
+
 /**
  * Aggressive chess player that finds the best move for the current position
  *
@@ -957,47 +2757,27 @@ function minimax(
  * @returns The best move according to aggressive strategy, or null if no moves available
  */
 export function findBestMove(state: GameState, searchDepth: number = SEARCH_DEPTH): Move | null {
+	return findBestScoredMove(state, searchDepth)?.move ?? null;
+}
+
+/**
+ * Variant of {@link findBestMove} that also returns the score the search found
+ * for the best move, from the moving side's point of view, so a caller that
+ * reports the evaluation along with the move needs only one search
+ *
+ * @param state - Current game state
+ * @param searchDepth - Optional search depth override (default: SEARCH_DEPTH)
+ * @returns The best move and its score, or null if no moves available
+ */
+export function findBestScoredMove(state: GameState, searchDepth: number = SEARCH_DEPTH): ScoredMove | null {
 	const moves = generateAllMoves(state);
 
 	if (moves.length === 0) {
 		return null;
 	}
 
-	// Sort moves to prioritize aggressive moves
-	const scoredMoves: ScoredMove[] = [];
-	const isMaximizing = state.currentPlayer === 'white';
-
-	for (const move of moves) {
-		const newState = applyMove(state, move);
-
-		// Add capture bonus to move ordering (aggressive preference)
-		let moveBonus = 0;
-		if (move.isCapture) {
-			const targetPiece = getPieceAt(state.board, move.to);
-			if (targetPiece) {
-				moveBonus = PIECE_VALUES[targetPiece.type] * CAPTURE_AGGRESSION_BONUS;
-			}
-		}
-
-		// Check if move gives check (aggressive!)
-		if (isKingInCheck(newState.board, getOpponentColor(state.currentPlayer))) {
-			moveBonus += CHECK_BONUS;
-		}
-
-		const score = minimax(newState, searchDepth - 1, -Infinity, Infinity, !isMaximizing);
-		scoredMoves.push({
-			move,
-			score: isMaximizing ? score + moveBonus : score - moveBonus,
-		});
-	}
-
-	// Sort moves by score
-	scoredMoves.sort((a, b) => {
-		return isMaximizing ? b.score - a.score : a.score - b.score;
-	});
-
-	// Return the best move
-	return scoredMoves[0]?.move ?? null;
+	const score = deepenRootMoves(state, moves, searchDepth, createSearchContext(state));
+	return { move: moves[0], score };
 }
 
 /**
@@ -1068,18 +2848,11 @@ export function algebraicToMove(algebraic: string, state: GameState): Move | nul
 	const isEnPassant = piece.type === 'pawn' &&
 		from.file !== to.file &&
 		!targetPiece &&
-		state.enPassantTarget &&
+		state.enPassantTarget !== null &&
 		to.rank === state.enPassantTarget.rank &&
 		to.file === state.enPassantTarget.file;
 
-	return {
-		from,
-		to,
-		promotion,
-		isCapture: targetPiece !== null || isEnPassant,
-		isCastle,
-		isEnPassant,
-	};
+	return createMove(from, to, targetPiece !== null || isEnPassant, promotion, isEnPassant, isCastle);
 }
 
 /**
@@ -1115,22 +2888,158 @@ export function printBoard(board: Board): string {
 	return output;
 }
 
+// ============================================================================
+// Test Support
+// ============================================================================
+
+/**
+ * Makes `moves` in place on a copy of `root`'s board the way the search does, a
+ * null entry passing the turn, then takes them back. Describes every ply where
+ * the incrementally kept state differs from the state computed from scratch, and
+ * every ply where taking a move back does not restore the board. For tests; an
+ * empty result means they all agree.
+ */
+export function checkSearchPathForTesting(root: GameState, moves: readonly (Move | null)[]): string[] {
+	const context = createSearchContext(root);
+	const mismatches: string[] = [];
+	const boards: Board[] = [];
+	let state: GameState = { ...root, board: cloneBoard(root.board) };
+	for (let ply = 0; ply < moves.length; ply++) {
+		const move = moves[ply];
+		boards.push(cloneBoard(state.board));
+		state = move ? makeSearchMove(context, ply, state, move) : makeNullMove(context, ply, state);
+
+		const line = moves.slice(0, ply + 1).map(played => played ? moveToAlgebraic(played) : 'pass').join(' ');
+		const [lo, hi] = computeZobristHalves(state);
+		if (context.hashLo[ply + 1] !== lo || context.hashHi[ply + 1] !== hi) {
+			mismatches.push(`hash after ${line}`);
+		}
+		for (const color of ['white', 'black'] as const) {
+			const king = findKing(state.board, color);
+			const kept = getSearchKing(context, ply + 1, color);
+			if (king?.rank !== kept?.rank || king?.file !== kept?.file) {
+				mismatches.push(`${color} king after ${line}`);
+			}
+		}
+		computePieceBitboards(state.board, evaluationBitboards, 0);
+		const offset = (ply + 1) * PIECE_BITBOARD_WORDS;
+		if (evaluationBitboards.some((word, index) => context.pieceBitboards[offset + index] !== word)) {
+			mismatches.push(`piece bitboards after ${line}`);
+		}
+		if (context.pieceSquareScores[ply + 1] !== computePieceSquareScore(evaluationBitboards, 0)) {
+			mismatches.push(`piece-square score after ${line}`);
+		}
+		for (const color of ['white', 'black'] as const) {
+			if (context.nonPawnPieces[(ply + 1) * 2 + (color === 'white' ? 0 : 1)] !== countNonPawnPieces(evaluationBitboards, 0, color)) {
+				mismatches.push(`${color} non-pawn pieces after ${line}`);
+			}
+		}
+		// The cached evaluation assumes the side that just moved is not in check
+		const opponent = getOpponentColor(state.currentPlayer);
+		const king = findKing(state.board, state.currentPlayer);
+		const opponentKing = findKing(state.board, opponent);
+		if (!opponentKing || !isSquareAttacked(state.board, opponentKing, state.currentPlayer)) {
+			const inCheck = king !== null && isSquareAttacked(state.board, king, opponent);
+			if (evaluatePositionCached(state, context, ply + 1, inCheck) !== evaluatePosition(state)) {
+				mismatches.push(`evaluation after ${line}`);
+			}
+		}
+	}
+
+	for (let ply = moves.length - 1; ply >= 0; ply--) {
+		const move = moves[ply];
+		if (move) {
+			unmakeSearchMove(context, ply, state.board, move);
+		}
+		const restored = boards[ply].every((row, rank) => row.every((piece, file) => {
+			const current = state.board[rank][file];
+			return piece?.type === current?.type && piece?.color === current?.color;
+		}));
+		if (!restored) {
+			mismatches.push(`board after taking back ${moves.slice(0, ply + 1).map(played => played ? moveToAlgebraic(played) : 'pass').join(' ')}`);
+		}
+	}
+	return mismatches;
+}
+
+/**
+ * Tells whether the search may pass the turn in a position, given enough depth
+ * left: never in check, and only with a piece besides pawns and the king, since
+ * zugzwang is likely without one. For tests.
+ */
+export function allowsNullMoveForTesting(state: GameState): boolean {
+	const kingPos = findKing(state.board, state.currentPlayer);
+	const inCheck = kingPos !== null && isSquareAttacked(state.board, kingPos, getOpponentColor(state.currentPlayer));
+	return !inCheck && hasNonPawnMaterial(createSearchContext(state), 0, state.currentPlayer);
+}
+
+/** A transposition table entry as seen by tests */
+export interface TranspositionEntryForTesting {
+	readonly depth: number;
+	readonly score: number;
+	readonly flag: 'exact' | 'lower' | 'upper';
+	/** The stored move the search would try first, or null if there is none or it is not legal */
+	readonly bestMove: string | null;
+}
+
+/**
+ * Records a search result for a position in the transposition table, as the
+ * search does after searching it at `ply` with the window (alpha, beta). For tests.
+ */
+export function storeTranspositionForTesting(state: GameState, depth: number, score: number, alpha: number, beta: number, bestMove: Move | null, ply = 0): void {
+	const [lo, hi] = computeZobristHalves(state);
+	storeTransposition(getTranspositionTable(), lo, hi, depth, ply, score, alpha, beta, bestMove);
+}
+
+/**
+ * Starts a new search from `root` without searching, which moves the
+ * transposition table on to a new generation. For tests.
+ */
+export function beginSearchForTesting(root: GameState): void {
+	createSearchContext(root);
+}
+
+/**
+ * Reads the transposition table entry of a position, as the search sees it at
+ * `ply`, or null if there is none. For tests.
+ */
+export function probeTranspositionForTesting(state: GameState, ply = 0): TranspositionEntryForTesting | null {
+	const [lo, hi] = computeZobristHalves(state);
+	const slot = lo & (TRANSPOSITION_TABLE_SIZE - 1);
+	const table = getTranspositionTable();
+	if (!matchesTransposition(table, slot, lo, hi)) {
+		return null;
+	}
+	const data = table.data[slot];
+	const score = scoreFromTransposition(table.score[slot], ply);
+	const flag = (data >>> TT_FLAG_SHIFT) & 3;
+	const kingPos = findKing(state.board, state.currentPlayer);
+	const inCheck = kingPos !== null && isSquareAttacked(state.board, kingPos, getOpponentColor(state.currentPlayer));
+	const bestMove = decodeHashMove(state, data & TT_MOVE_MASK, kingPos, inCheck);
+	return {
+		depth: data >>> TT_DEPTH_SHIFT,
+		score,
+		flag: flag === TT_EXACT ? 'exact' : flag === TT_LOWER_BOUND ? 'lower' : 'upper',
+		bestMove: bestMove ? moveToAlgebraic(bestMove) : null,
+	};
+}
+
 // ============================================================================
 // Example Usage
 // ============================================================================
 
 /**
- * Example: Play a game between two aggressive players
+ * Example: Play a game between two aggressive players, opening from the book. Each
+ * move is reported in a single write; with `showBoard` false the board diagrams
+ * are left out, so a script reading the output gets just the move lines.
  */
-export function playAggressiveGame(maxMoves: number = 100): void {
+export function playAggressiveGame(maxMoves: number = 100, showBoard: boolean = true): void {
 	let state = createInitialGameState();
 
-	console.log('Starting Aggressive Chess Game!\n');
-	console.log(printBoard(state.board));
-	console.log('\n');
+	console.log('Starting Aggressive Chess Game!\n' + (showBoard ? '\n' + printBoard(state.board) + '\n\n' : ''));
 
 	for (let moveNum = 1; moveNum <= maxMoves; moveNum++) {
-		const move = findBestMove(state);
+		const move = findBookMove(state) ?? findBestMove(state);
 
 		if (!move) {
 			const inCheck = isKingInCheck(state.board, state.currentPlayer);
@@ -1145,13 +3054,13 @@ export function playAggressiveGame(maxMoves: number = 100): void {
 		const moveNotation = moveToAlgebraic(move);
 		state = applyMove(state, move);
 
-		console.log(`Move ${moveNum}: ${state.currentPlayer === 'black' ? 'White' : 'Black'} plays ${moveNotation}`);
-
+		let report = `Move ${moveNum}: ${state.currentPlayer === 'black' ? 'White' : 'Black'} plays ${moveNotation}`;
 		if (isKingInCheck(state.board, state.currentPlayer)) {
-			console.log('Check!');
+			report += '\nCheck!';
 		}
-
-		console.log(printBoard(state.board));
-		console.log('\n');
+		if (showBoard) {
+			report += '\n' + printBoard(state.board) + '\n\n';
+		}
+		console.log(report);
 	}
 }
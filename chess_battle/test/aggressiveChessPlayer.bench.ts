@@ -0,0 +1,48 @@
+/*---------------------------------------------------------------------------------------------
+ *  Copyright (c) Microsoft Corporation. All rights reserved.
+ *  Licensed under the MIT License. See License.txt in the project root for license information.
+ *--------------------------------------------------------------------------------------------*/
+
+import { bench, describe, vi } from 'vitest';
+import type * as AggressiveChessPlayer from '../aggressiveChessPlayer';
+
+const BENCH_DEPTH = 5;
+
+/** Middlegame positions, as moves from the initial position */
+const BENCH_LINES = [
+	'e2e4 e7e5 g1f3 b8c6 f1c4 f8c5 c2c3 g8f6 d2d4',
+	'd2d4 d7d5 c2c4 e7e6 b1c3 g8f6 c1g5 f8e7 e2e3 e8g8',
+	'e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6 c1e3 e7e5',
+];
+
+/** Each run is measured once: repeating it would be answered by the transposition table */
+const SINGLE_RUN = { iterations: 1, time: 0, warmupIterations: 0, warmupTime: 0 };
+
+let player: typeof AggressiveChessPlayer;
+let positions: AggressiveChessPlayer.GameState[];
+
+function playLine(line: string): AggressiveChessPlayer.GameState {
+	let state = player.createInitialGameState();
+	for (const algebraic of line.split(' ')) {
+		state = player.applyMove(state, player.algebraicToMove(algebraic, state)!);
+	}
+	return state;
+}
+
+/**
+ * Imports a fresh copy of the player, with an empty transposition table and evaluation caches,
+ * so no run is answered by the results of an earlier one
+ */
+async function loadFreshPlayer(): Promise<void> {
+	vi.resetModules();
+	player = await import('../aggressiveChessPlayer');
+	positions = BENCH_LINES.map(playLine);
+}
+
+describe(`aggressive chess player search to depth ${BENCH_DEPTH}`, () => {
+	bench('findBestMove', () => {
+		for (const state of positions) {
+			player.findBestMove(state, BENCH_DEPTH);
+		}
+	}, { ...SINGLE_RUN, setup: loadFreshPlayer });
+});
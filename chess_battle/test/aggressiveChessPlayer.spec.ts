@@ -0,0 +1,214 @@
+/*---------------------------------------------------------------------------------------------
+ *  Copyright (c) Microsoft Corporation. All rights reserved.
+ *  Licensed under the MIT License. See License.txt in the project root for license information.
+ *--------------------------------------------------------------------------------------------*/
+
+import assert from 'assert';
+import { suite, test } from 'vitest';
+import type { Board, GameState, Move, PieceType } from '../aggressiveChessPlayer';
+import { algebraicToMove, algebraicToPosition, allowsNullMoveForTesting, applyMove, beginSearchForTesting, checkSearchPathForTesting, createInitialGameState, findBestMove, findBestScoredMove, findBookMove, generateAllMoves, moveToAlgebraic, probeTranspositionForTesting, storeTranspositionForTesting } from '../aggressiveChessPlayer';
+
+const FEN_PIECES: Record<string, PieceType> = { p: 'pawn', n: 'knight', b: 'bishop', r: 'rook', q: 'queen', k: 'king' };
+
+function parseFen(fen: string): GameState {
+	const [placement, turn, castling, enPassant, halfMoveClock, fullMoveNumber] = fen.split(' ');
+	const board: Board = Array.from({ length: 8 }, () => Array(8).fill(null));
+	placement.split('/').forEach((row, index) => {
+		let file = 0;
+		for (const char of row) {
+			if (/\d/.test(char)) {
+				file += Number(char);
+			} else {
+				board[7 - index][file++] = { type: FEN_PIECES[char.toLowerCase()], color: char === char.toUpperCase() ? 'white' : 'black' };
+			}
+		}
+	});
+	return {
+		board,
+		currentPlayer: turn === 'w' ? 'white' : 'black',
+		castlingRights: {
+			whiteKingside: castling.includes('K'),
+			whiteQueenside: castling.includes('Q'),
+			blackKingside: castling.includes('k'),
+			blackQueenside: castling.includes('q'),
+		},
+		enPassantTarget: enPassant === '-' ? null : algebraicToPosition(enPassant),
+		halfMoveClock: Number(halfMoveClock ?? 0),
+		fullMoveNumber: Number(fullMoveNumber ?? 1),
+	};
+}
+
+function playMoves(state: GameState, moves: string[]): GameState {
+	for (const algebraic of moves) {
+		const move = algebraicToMove(algebraic, state);
+		assert.ok(move, `illegal move ${algebraic}`);
+		state = applyMove(state, move);
+	}
+	return state;
+}
+
+/** Calls `visit` with every line of `depth` legal moves from `state`, and with lines cut short by mate or stalemate */
+function forEachLine(state: GameState, depth: number, visit: (line: readonly Move[]) => void, line: Move[] = []): void {
+	const moves = depth > 0 ? generateAllMoves(state) : [];
+	if (moves.length === 0) {
+		visit(line);
+	}
+	for (const move of moves) {
+		line.push(move);
+		forEachLine(applyMove(state, move), depth - 1, visit, line);
+		line.pop();
+	}
+}
+
+function perft(state: GameState, depth: number): number {
+	if (depth === 0) {
+		return 1;
+	}
+	let nodes = 0;
+	for (const move of generateAllMoves(state)) {
+		nodes += perft(applyMove(state, move), depth - 1);
+	}
+	return nodes;
+}
+
+/** Positions with castling, en passant and promotions, from https://www.chessprogramming.org/Perft_Results */
+const SPECIAL_MOVE_FENS = [
+	'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+	'8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+	'r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1',
+	'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+];
+
+suite('Aggressive chess player incremental search state', function () {
+	test('keeps the incremental search state in step with the board through make and unmake', function () {
+		for (const fen of SPECIAL_MOVE_FENS) {
+			forEachLine(parseFen(fen), 2, line => {
+				assert.deepStrictEqual(checkSearchPathForTesting(parseFen(fen), line), []);
+			});
+		}
+	});
+
+	test('keeps the incremental search state in step across a null move', function () {
+		for (const fen of SPECIAL_MOVE_FENS) {
+			forEachLine(parseFen(fen), 1, line => {
+				assert.deepStrictEqual(checkSearchPathForTesting(parseFen(fen), [null, ...line]), []);
+				assert.deepStrictEqual(checkSearchPathForTesting(parseFen(fen), [...line, null]), []);
+			});
+		}
+	});
+});
+
+suite('Aggressive chess player transposition table', function () {
+	test('stores scores outside the search window as bounds', function () {
+		const state = parseFen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1');
+		storeTranspositionForTesting(state, 3, 50, 0, 100, algebraicToMove('e2a6', state));
+		assert.deepStrictEqual(probeTranspositionForTesting(state), { depth: 3, score: 50, flag: 'exact', bestMove: 'e2a6' });
+		storeTranspositionForTesting(state, 3, 0, 0, 100, null);
+		assert.deepStrictEqual(probeTranspositionForTesting(state), { depth: 3, score: 0, flag: 'upper', bestMove: null });
+		storeTranspositionForTesting(state, 3, 120, 0, 100, algebraicToMove('d5e6', state));
+		assert.deepStrictEqual(probeTranspositionForTesting(state), { depth: 3, score: 120, flag: 'lower', bestMove: 'd5e6' });
+	});
+
+	test('keys entries by position', function () {
+		const state = parseFen('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1');
+		storeTranspositionForTesting(state, 2, 10, 0, 100, null);
+		assert.strictEqual(probeTranspositionForTesting(applyMove(state, algebraicToMove('e2e4', state)!)), null);
+		assert.strictEqual(probeTranspositionForTesting({ ...state, currentPlayer: 'black' }), null);
+	});
+
+	test('never hands an illegal best move to the search', function () {
+		const state = parseFen('4k3/4r3/8/8/8/8/4N3/4K3 w - - 0 1');
+		for (const illegal of ['e2c3', 'e1e3', 'e7e6', 'a1a2']) {
+			const move: Move = { from: algebraicToPosition(illegal.slice(0, 2)), to: algebraicToPosition(illegal.slice(2)) };
+			storeTranspositionForTesting(state, 3, 10, 0, 100, move);
+			assert.strictEqual(probeTranspositionForTesting(state)?.bestMove, null, illegal);
+		}
+		storeTranspositionForTesting(state, 3, 10, 0, 100, algebraicToMove('e1d1', state));
+		assert.strictEqual(probeTranspositionForTesting(state)?.bestMove, 'e1d1');
+	});
+
+	test('stores mate scores by distance from the position', function () {
+		const state = parseFen('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1');
+		storeTranspositionForTesting(state, 2, 999_995, -100, 1_000_000, null, 3);
+		assert.strictEqual(probeTranspositionForTesting(state, 3)?.score, 999_995);
+		assert.strictEqual(probeTranspositionForTesting(state, 1)?.score, 999_997);
+		storeTranspositionForTesting(state, 2, -999_995, -1_000_000, 100, null, 3);
+		assert.strictEqual(probeTranspositionForTesting(state, 5)?.score, -999_993);
+		storeTranspositionForTesting(state, 2, 40, 0, 100, null, 3);
+		assert.strictEqual(probeTranspositionForTesting(state, 1)?.score, 40);
+	});
+
+	test('keeps deeper entries only within one search', function () {
+		const state = parseFen('r3k2r/Pppp1ppp/1b3nbn/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1');
+		beginSearchForTesting(state);
+		storeTranspositionForTesting(state, 6, 30, 0, 100, null);
+		storeTranspositionForTesting(state, 2, 40, 0, 100, null);
+		assert.strictEqual(probeTranspositionForTesting(state)?.depth, 6);
+
+		beginSearchForTesting(state);
+		storeTranspositionForTesting(state, 2, 40, 0, 100, null);
+		assert.deepStrictEqual(probeTranspositionForTesting(state), { depth: 2, score: 40, flag: 'exact', bestMove: null });
+	});
+});
+
+suite('Aggressive chess player null-move pruning', function () {
+	test('passes the turn only outside check and with a piece besides pawns', function () {
+		assert.strictEqual(allowsNullMoveForTesting(parseFen('4k3/8/8/8/8/8/4P3/1N2K3 w - - 0 1')), true);
+		assert.strictEqual(allowsNullMoveForTesting(parseFen('4k3/8/8/8/8/8/4P3/4K3 w - - 0 1')), false);
+		assert.strictEqual(allowsNullMoveForTesting(parseFen('4k3/4p3/8/8/8/8/8/1N2K3 b - - 0 1')), false);
+		assert.strictEqual(allowsNullMoveForTesting(parseFen('4k3/8/8/8/1b6/8/8/1N2K3 w - - 0 1')), false);
+	});
+});
+
+suite('Aggressive chess player move generation', function () {
+	// Reference node counts to depths 1-3, from https://www.chessprogramming.org/Perft_Results
+	const positions: { name: string; fen: string; nodes: number[] }[] = [
+		{ name: 'start position', fen: 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1', nodes: [20, 400, 8902] },
+		{ name: 'kiwipete', fen: 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', nodes: [48, 2039, 97862] },
+		{ name: 'position 3', fen: '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', nodes: [14, 191, 2812] },
+		{ name: 'position 4', fen: 'r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1', nodes: [6, 264, 9467] },
+		{ name: 'position 5', fen: 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', nodes: [44, 1486, 62379] },
+		{ name: 'position 6', fen: 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10', nodes: [46, 2079, 89890] },
+	];
+
+	for (const { name, fen, nodes } of positions) {
+		test(`perft of ${name}`, function () {
+			const state = parseFen(fen);
+			assert.deepStrictEqual(nodes.map((_, index) => perft(state, index + 1)), nodes);
+		});
+	}
+});
+
+suite('Aggressive chess player search', function () {
+	test('captures the castling rook without leaving stale castling rights', function () {
+		const state = playMoves(parseFen('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8'), ['b1c3', 'f2h1']);
+		assert.strictEqual(state.castlingRights.whiteKingside, false);
+		forEachLine(state, 1, line => assert.deepStrictEqual(checkSearchPathForTesting(state, line), []));
+		for (const depth of [2, 3]) {
+			const move = findBestMove(state, depth);
+			assert.ok(move);
+			assert.strictEqual(moveToAlgebraic(move), 'd7c8q');
+		}
+	});
+
+	test('scores a quicker mate above a slower one', function () {
+		const mateInOne = findBestScoredMove(parseFen('7k/p5R1/2p2K2/8/8/8/8/R7 w - - 0 1'), 3)!;
+		const mateInTwo = findBestScoredMove(parseFen('7k/p7/2p2K2/8/8/8/8/R5R1 w - - 0 1'), 3)!;
+		assert.strictEqual(moveToAlgebraic(mateInOne.move), 'a1h1');
+		assert.strictEqual(mateInOne.score - mateInTwo.score, 2);
+	});
+
+	test('answers opening book positions with the book move', function () {
+		const initial = createInitialGameState();
+		assert.strictEqual(moveToAlgebraic(findBookMove(initial)!), 'e2e4');
+		assert.strictEqual(moveToAlgebraic(findBookMove(playMoves(initial, ['e2e4', 'c7c5']))!), 'g1f3');
+		assert.strictEqual(moveToAlgebraic(findBookMove(playMoves(initial, ['e2e4', 'e7e5', 'f2f4']))!), 'e5f4');
+		assert.strictEqual(findBookMove(playMoves(initial, ['a2a3'])), null);
+	});
+
+	test('searches opening book positions like any other', function () {
+		const initial = createInitialGameState();
+		assert.strictEqual(moveToAlgebraic(findBestMove(initial, 1)!), moveToAlgebraic(findBestScoredMove(initial, 1)!.move));
+		assert.notStrictEqual(moveToAlgebraic(findBestMove(initial, 1)!), 'e2e4');
+	});
+});